@@ -0,0 +1,31 @@
+import time
+from typing import Optional
+
+from backend.services.redis_service import redis_service
+
+# Bumped whenever a Sport, Competition or Event row changes
+CATALOG_VERSION_KEY = "catalog:version"
+
+
+def _seed_version() -> int:
+    # Seed from the clock so a flushed Redis never re-issues an ETag clients already hold
+    return int(time.time() * 1000)
+
+
+def bump_catalog_version() -> None:
+    """
+    Mark the sport/competition/event catalog as changed, invalidating catalog ETags.
+    """
+    redis_service.set_if_absent(CATALOG_VERSION_KEY, _seed_version())
+    redis_service.increment(CATALOG_VERSION_KEY)
+
+
+def get_catalog_etag(request, *args, **kwargs) -> Optional[str]:
+    """
+    ETag for the catalog endpoints: one GET of the version counter, no DB query.
+    """
+    version = redis_service.get_raw(CATALOG_VERSION_KEY)
+    if version is None:
+        redis_service.set_if_absent(CATALOG_VERSION_KEY, _seed_version())
+        version = redis_service.get_raw(CATALOG_VERSION_KEY)
+    return f"catalog-{version}" if version else None
@@ -0,0 +1,90 @@
+from typing import Any, Dict, List, Optional
+
+# Column order of the compact odds encoding. Fields that are always null in
+# the JSON documents (updateTime, isLiveStream, totalMatched, active, price)
+# are left out, as are duplicates (runner == runnerName, eventId == eventid)
+# and ladder levels, which are implicit in the ladder order.
+COMPACT_SCHEMA = {
+    "version": 1,
+    "event": ["eventid", "eventName", "status", "inplay", "sportId", "sportName"],
+    "market": ["marketId", "market", "markettype", "status", "inplay", "min", "max", "runners"],
+    "runner": ["selectionId", "runnerName", "status", "back", "lay"],
+    # back/lay: flat [rate, size, rate, size, ...], best level first
+    "ladder": ["rate", "size"],
+}
+
+
+def compact_event(document: Dict[str, Any], levels: Optional[int] = None,
+                  with_schema: bool = True) -> Dict[str, Any]:
+    """
+    Encode a response-shaped odds document (or delta) in the compact format:
+    arrays ordered like COMPACT_SCHEMA instead of objects, numeric rates, and
+    at most `levels` ladder levels per side.
+    """
+    compact = {
+        "event": [
+            document.get("eventid"),
+            document.get("eventName"),
+            document.get("status"),
+            document.get("inplay"),
+            document.get("sportId"),
+            (document.get("sport") or {}).get("name"),
+        ],
+        "markets": {
+            group: [_compact_market(market, levels) for market in markets_list]
+            for group, markets_list in (document.get("markets") or {}).items()
+        },
+    }
+    if "removed" in document:
+        compact["removed"] = document["removed"]
+    if with_schema:
+        compact = {"schema": COMPACT_SCHEMA, **compact}
+    return compact
+
+
+def parse_levels(value: Any) -> Optional[int]:
+    """
+    The `levels` query parameter as a positive int, or None when absent/invalid.
+    """
+    try:
+        levels = int(value)
+    except (TypeError, ValueError):
+        return None
+    return levels if levels > 0 else None
+
+
+def _compact_market(market: Dict[str, Any], levels: Optional[int]) -> List[Any]:
+    return [
+        market.get("marketId"),
+        market.get("market"),
+        market.get("markettype"),
+        market.get("status"),
+        market.get("inplay"),
+        market.get("min"),
+        market.get("max"),
+        [
+            [
+                runner.get("selectionId"),
+                runner.get("runnerName"),
+                runner.get("status"),
+                _compact_ladder(runner.get("back"), levels),
+                _compact_ladder(runner.get("lay"), levels),
+            ]
+            for runner in market.get("runners") or []
+        ],
+    ]
+
+
+def _compact_ladder(ladder: Optional[List[Dict[str, Any]]], levels: Optional[int]) -> List[Any]:
+    flat = []
+    for level in (ladder or [])[:levels]:
+        flat.append(_to_number(level.get("rate")))
+        flat.append(level.get("size"))
+    return flat
+
+
+def _to_number(rate: Any) -> Any:
+    try:
+        return float(rate)
+    except (TypeError, ValueError):
+        return rate
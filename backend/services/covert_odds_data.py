@@ -1,10 +1,31 @@
-from typing import Dict, Any
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
 
+import orjson
+from django.conf import settings
 
+from backend.services import metrics
+from backend.services.odds_model import OddsEvent, OddsMarket
+from backend.services.sport_name_service import get_sport_name
+
+MARKET_TYPE_NAMES = {
+    "bookmaker": "BOOKMAKER",
+    "fancy": "FANCY",
+    "odds": "ODDS",
+    "session": "SESSION",
+    "toss": "TOSS"
+}
+
+
+@lru_cache(maxsize=8192)
 def get_market_type_key(mname: str, gtype: str = None) -> str:
     """
     Determine market type key based on mname and gtype.
     Returns a normalized key for grouping similar markets.
+
+    Memoized per (mname, gtype): markets repeat on every refresh.
     """
     mname_lower = mname.lower() if mname else ""
     gtype_lower = gtype.lower() if gtype else ""
@@ -23,39 +44,113 @@ def get_market_type_key(mname: str, gtype: str = None) -> str:
         return mname_lower.replace(" ", "_") if mname_lower else "unknown"
 
 
+@lru_cache(maxsize=8192)
 def get_market_type_name(mname: str, gtype: str = None) -> str:
     """
     Get the standardized market type name for the markettype field.
     """
     market_key = get_market_type_key(mname, gtype)
-
-    type_mapping = {
-        "bookmaker": "BOOKMAKER",
-        "fancy": "FANCY",
-        "odds": "ODDS",
-        "session": "SESSION",
-        "toss": "TOSS"
-    }
-
-    return type_mapping.get(market_key, market_key.upper()) 
+    return MARKET_TYPE_NAMES.get(market_key, market_key.upper())
 
 
 def get_sport_name_by_id(sport_id: int) -> str:
     """
-    Get sport name from database using sport_id (event_type_id).
+    Get sport name using sport_id (event_type_id), from the sport name cache.
     """
     try:
-        from sports.models import Sport
-        sport = Sport.objects.filter(event_type_id=sport_id).first()
-        return sport.name if sport else "Unknown Sport"
+        return get_sport_name(sport_id)
     except Exception as e:
         return "Unknown Sport"
 
 
-def convert_odds_format(source_data: Dict[str, Any], sport_id: int = None, event_id: int = None) -> Dict[str, Any]:
+def get_highlight_entries(highlight_data: Any) -> List[Dict[str, Any]]:
     """
-    Convert odds data from source format to target format with mname separation.
-    Now includes sport_id and fetches sport name from database.
+    Flatten the t1/t2 lists of highlight data into one list of market entries.
+    """
+    if isinstance(highlight_data, dict):
+        entries = []
+        for key in ["t1", "t2"]:
+            if key in highlight_data and isinstance(highlight_data[key], list):
+                entries.extend(highlight_data[key])
+        return entries
+    elif isinstance(highlight_data, list):
+        return highlight_data
+    return []
+
+
+def split_highlight_by_event(source_data: Any) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Group the market entries of a highlighthomePrivate response by event (gmid),
+    so each group can be passed to convert_odds_format as {"data": entries}.
+    """
+    if isinstance(source_data, dict) and isinstance(source_data.get("highlight"), dict):
+        highlight_data = source_data["highlight"].get("data")
+    elif isinstance(source_data, dict) and "data" in source_data:
+        highlight_data = source_data["data"]
+    else:
+        highlight_data = source_data
+
+    events = {}
+    for entry in get_highlight_entries(highlight_data):
+        if isinstance(entry, dict) and entry.get("gmid"):
+            events.setdefault(str(entry["gmid"]), []).append(entry)
+    return events
+
+
+class MarketConversionCache:
+    """
+    Converted markets of the previous refreshes, keyed by (event_id, mid).
+
+    Each entry keeps the raw market's serialized form next to its converted
+    OddsMarket, so a market whose raw data did not change since the last
+    tick is reused as is instead of being rebuilt. Least recently used
+    entries are dropped beyond `max_entries`. Reused markets are shared
+    between documents and must not be mutated.
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+
+    def get(self, key: Tuple[Any, Any], raw: bytes) -> Optional[OddsMarket]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] != raw:
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def put(self, key: Tuple[Any, Any], raw: bytes, market: OddsMarket) -> None:
+        with self._lock:
+            self._entries[key] = (raw, market)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+market_cache = MarketConversionCache(settings.ODDS_CONVERT_CACHE_SIZE)
+
+
+def convert_market(event: Dict[str, Any]) -> Optional[OddsMarket]:
+    """
+    Convert one raw market (one entry of the source data list).
+    Returns None when it has no runners.
+    """
+    if not event.get("section") or not isinstance(event["section"], list):
+        return None
+
+    mname = event.get("mname", "")
+    return OddsMarket.from_raw(event, get_market_type_name(mname, event.get("gtype", "")))
+
+
+def build_odds_event(source_data: Dict[str, Any], sport_id: int = None, event_id: int = None) -> Optional[OddsEvent]:
+    """
+    Convert odds data from source format into an OddsEvent, or None when it
+    holds no market data.
+
+    With an event_id, markets whose raw data is unchanged since the event's
+    previous conversion are reused from market_cache instead of rebuilt.
     """
     try:
         data_section = None
@@ -63,130 +158,84 @@ def convert_odds_format(source_data: Dict[str, Any], sport_id: int = None, event
         if "odds" in source_data and "data" in source_data["odds"]:
             data_section = source_data["odds"]["data"]
         elif "highlight" in source_data and "data" in source_data["highlight"]:
-            highlight_data = source_data["highlight"]["data"]
-            if isinstance(highlight_data, dict):
-                data_section = []
-                for key in ["t1", "t2"]:
-                    if key in highlight_data and isinstance(highlight_data[key], list):
-                        data_section.extend(highlight_data[key])
-            elif isinstance(highlight_data, list):
-                data_section = highlight_data
+            data_section = get_highlight_entries(source_data["highlight"]["data"])
         elif "data" in source_data:
             data_section = source_data["data"]
         elif isinstance(source_data, list):
             data_section = source_data
 
         if not data_section or not isinstance(data_section, list):
-            return {}
-
-        if not data_section:
-            return {}
+            return None
 
         first_event = data_section[0]
 
-        # Get sport name from database if sport_id is provided
+        # Get sport name from the cache if sport_id is provided
         sport_name = get_sport_name_by_id(sport_id) if sport_id else None
 
-        result = {
-            "eventid": str(first_event.get("gmid", "")),
-            "eventName": first_event.get("ename", ""),
-            "updateTime": None,
-            "status": "ACTIVE",
-            "inplay": first_event.get("iplay", False),
-            "sport": {"name": sport_name},
-            "sportId": sport_id,  # Store the sport_id
-            "eventId": event_id,  # Store the event_id
-            "isLiveStream": None,
-            "markets": {}
-        }
+        result = OddsEvent(
+            eventid=str(first_event.get("gmid", "")),
+            event_name=first_event.get("ename", ""),
+            inplay=first_event.get("iplay", False),
+            sport_name=sport_name,
+            sport_id=sport_id,
+            event_id=event_id,
+            markets=[],
+        )
+
+        use_cache = event_id is not None and settings.ODDS_CONVERT_CACHE_SIZE > 0
+        reused = rebuilt = 0
 
         for event in data_section:
             if not isinstance(event, dict):
                 continue
 
-            if not event.get("section") or not isinstance(event["section"], list):
-                continue
-
-            mname = event.get("mname", "")
-            gtype = event.get("gtype", "")
-            market_type = get_market_type_name(mname, gtype)
-
-            market = {
-                "marketId": str(event.get("mid", "")),
-                "market": mname,
-                "status": event.get("status", ""),
-                "inplay": event.get("iplay", False),
-                "totalMatched": None,
-                "active": None,
-                "markettype": market_type,
-                "min": str(event.get("min", "")),
-                "max": str(event.get("max", "")),
-                "runners": []
-            }
-
-            for section in event["section"]:
-                if not section or not isinstance(section, dict):
+            cache_key = raw = None
+            if use_cache:
+                cache_key = (event_id, event.get("mid"))
+                raw = orjson.dumps(event, option=orjson.OPT_NON_STR_KEYS)
+                market = market_cache.get(cache_key, raw)
+                if market is not None:
+                    result.markets.append(market)
+                    reused += 1
                     continue
 
-                runner = {
-                    "runnerName": section.get("nat", "").strip(),
-                    "selectionId": section.get("sid", 0),
-                    "status": section.get("gstatus", ""),
-                    "back": [],
-                    "lay": [],
-                    "runner": section.get("nat", "").strip()
-                }
-
-                if section.get("odds") and isinstance(section["odds"], list):
-                    back_odds = [
-                        odd for odd in section["odds"]
-                        if odd.get("otype") == "back" and odd.get("odds", 0) > 0
-                    ]
-                    for level, odd in enumerate(back_odds):
-                        runner["back"].append({
-                            "rate": str(odd.get("odds", 0)),
-                            "size": odd.get("size", 0),
-                            "price": None,
-                            "level": level
-                        })
-
-                    lay_odds = [
-                        odd for odd in section["odds"]
-                        if odd.get("otype") == "lay" and odd.get("odds", 0) > 0
-                    ]
-                    for level, odd in enumerate(lay_odds):
-                        runner["lay"].append({
-                            "rate": str(odd.get("odds", 0)),
-                            "size": odd.get("size", 0),
-                            "price": None,
-                            "level": level
-                        })
-
-                market["runners"].append(runner)
-
-            if market["runners"]:
-                mname_key = mname.strip() if mname else "unknown"
-                if mname_key not in result["markets"]:
-                    result["markets"][mname_key] = []
-                result["markets"][mname_key].append(market)
-
-        all_statuses = []
-        for markets in result["markets"].values():
-            for market in markets:
-                all_statuses.append(market["status"])
-
-        if all_statuses:
-            if "SUSPENDED" in all_statuses:
-                result["status"] = "SUSPENDED"
-            elif "OPEN" in all_statuses:
-                result["status"] = "OPEN"
-            elif "CLOSED" in all_statuses:
-                result["status"] = "CLOSED"
+            market = convert_market(event)
+            if market is None:
+                continue
+            rebuilt += 1
+
+            if use_cache:
+                market_cache.put(cache_key, raw, market)
+            result.markets.append(market)
+
+        if use_cache:
+            metrics.incr("odds_convert.markets_reused", reused)
+            metrics.incr("odds_convert.markets_rebuilt", rebuilt)
+
+        statuses = {market.status for market in result.markets}
+        if statuses:
+            if "SUSPENDED" in statuses:
+                result.status = "SUSPENDED"
+            elif "OPEN" in statuses:
+                result.status = "OPEN"
+            elif "CLOSED" in statuses:
+                result.status = "CLOSED"
             else:
-                result["status"] = all_statuses[0]
+                result.status = result.markets[0].status
+
+    except (KeyError, TypeError, AttributeError, orjson.JSONEncodeError) as e:
+
+        return None
 
-    except (KeyError, TypeError, AttributeError) as e:
+    return result
 
-        return {}
 
-    return result
\ No newline at end of file
+def convert_odds_format(source_data: Dict[str, Any], sport_id: int = None, event_id: int = None) -> Dict[str, Any]:
+    """
+    Convert odds data from source format to target format with mname separation.
+    Now includes sport_id and the sport name (cached, no database query).
+
+    Dict form of build_odds_event, for callers outside the ingestion path.
+    """
+    event = build_odds_event(source_data, sport_id=sport_id, event_id=event_id)
+    return event.to_dict() if event is not None else {}
@@ -1,10 +1,18 @@
 import json
 import hashlib
+import threading
+import time
 from base64 import b64decode
+from binascii import a2b_base64, b2a_base64
+from collections import OrderedDict
+from functools import lru_cache
 from Crypto.Cipher import AES
 import os
 from base64 import b64encode
 
+import orjson
+from django.conf import settings
+
 def openssl_bytes_to_key(password: bytes, salt: bytes, key_len: int, iv_len: int):
     """
     Replicates OpenSSL's EVP_BytesToKey (MD5 based).
@@ -73,3 +81,109 @@ def encrypt_data(data, password: str) -> str:
     # Prepend Salted__ + salt (OpenSSL format)
     openssl_blob = b"Salted__" + salt + encrypted
     return b64encode(openssl_blob).decode("utf-8")
+
+
+# ----------------------------------------------
+#                 FAST CODEC
+# ----------------------------------------------
+
+@lru_cache(maxsize=4096)
+def _derive_key_iv(password: bytes, salt: bytes):
+    """
+    openssl_bytes_to_key for AES-256-CBC, memoized per (password, salt).
+    """
+    return openssl_bytes_to_key(password, salt, 32, 16)
+
+
+class CryptCodec:
+    """
+    Hot-path version of encrypt_data/decrypt_data for one password.
+
+    - Derived key/IV pairs are kept in an LRU keyed by salt.
+    - Request envelopes are encrypted once per payload and reused for
+      `envelope_ttl` seconds (upstream decrypts them the same way; only the
+      salt differs from a freshly encrypted one).
+    - Responses are decrypted from memoryviews into a preallocated buffer
+      and parsed with orjson, without intermediate str copies.
+
+    Wire format and results are the same as encrypt_data/decrypt_data.
+    """
+
+    def __init__(self, password: str, envelope_ttl: float = 300.0, max_envelopes: int = 4096):
+        self.password = password.encode()
+        self.envelope_ttl = envelope_ttl
+        self.max_envelopes = max_envelopes
+
+        self._lock = threading.Lock()
+        self._envelopes = OrderedDict()
+
+    def encrypt(self, data) -> str:
+        """
+        Encrypted request envelope for `data`, reused while still valid.
+        """
+        cache_key = data if isinstance(data, str) else orjson.dumps(data)
+        now = time.monotonic()
+        with self._lock:
+            cached = self._envelopes.get(cache_key)
+            if cached is not None and cached[1] > now:
+                self._envelopes.move_to_end(cache_key)
+                return cached[0]
+
+        envelope = self._encrypt(data)
+        with self._lock:
+            self._envelopes[cache_key] = (envelope, now + self.envelope_ttl)
+            self._envelopes.move_to_end(cache_key)
+            while len(self._envelopes) > self.max_envelopes:
+                self._envelopes.popitem(last=False)
+        return envelope
+
+    def decrypt(self, ciphertext):
+        raw = memoryview(a2b_base64(ciphertext))
+        if raw[:8] != b"Salted__":
+            raise ValueError("Invalid ciphertext format")
+
+        key, iv = _derive_key_iv(self.password, bytes(raw[8:16]))
+        decrypted = bytearray(len(raw) - 16)
+        AES.new(key, AES.MODE_CBC, iv).decrypt(raw[16:], output=decrypted)
+
+        # Remove PKCS7 padding
+        pad_len = decrypted[-1] if decrypted else 0
+        if pad_len < 1 or pad_len > AES.block_size:
+            raise ValueError("Invalid padding")
+        body = memoryview(decrypted)[:-pad_len]
+
+        try:
+            return orjson.loads(body)
+        except orjson.JSONDecodeError:
+            return bytes(body).decode("utf-8")
+
+    def _encrypt(self, data) -> str:
+        if not isinstance(data, str):
+            data = json.dumps(data)
+        data_bytes = data.encode("utf-8")
+
+        pad_len = AES.block_size - (len(data_bytes) % AES.block_size)
+        data_bytes += bytes([pad_len]) * pad_len
+
+        salt = os.urandom(8)
+        key, iv = _derive_key_iv(self.password, salt)
+        encrypted = AES.new(key, AES.MODE_CBC, iv).encrypt(data_bytes)
+        return b2a_base64(b"Salted__" + salt + encrypted, newline=False).decode("ascii")
+
+
+_codecs = {}
+_codecs_lock = threading.Lock()
+
+
+def get_codec(password: str) -> CryptCodec:
+    """
+    Process-wide CryptCodec for `password`.
+    """
+    codec = _codecs.get(password)
+    if codec is None:
+        with _codecs_lock:
+            codec = _codecs.get(password)
+            if codec is None:
+                codec = CryptCodec(password, envelope_ttl=settings.CRYPT_ENVELOPE_TTL)
+                _codecs[password] = codec
+    return codec
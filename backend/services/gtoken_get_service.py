@@ -1,5 +1,4 @@
 import os
-import time
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.chrome.options import Options
@@ -7,7 +6,8 @@ from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.chrome.service import Service
 
-def get_cookie_token():
+
+def _create_driver():
     # Configure Chrome options
     options = Options()
     options.binary_location = os.getenv("CHROMIUM_PATH", "/usr/bin/chromium")
@@ -19,15 +19,49 @@ def get_cookie_token():
     options.add_argument("--disable-extensions")
 
     service = Service(os.getenv("CHROMEDRIVER_PATH", "/usr/bin/chromedriver"))
-    driver = webdriver.Chrome(service=service, options=options)
+    return webdriver.Chrome(service=service, options=options)
 
-    try:
-        driver.get("https://d247.com/")
 
-        # Debug: save page source and screenshot before waiting
-        with open("/code/page_source_before.html", "w", encoding="utf-8") as f:
-            f.write(driver.page_source)
-        driver.save_screenshot("/code/screenshot_before.png")
+def _find_g_token(driver):
+    for cookie in driver.get_cookies():
+        if cookie["name"] == "g_token":
+            return f"{cookie['name']}={cookie['value']};"
+    return None
+
+
+class TokenBrowser:
+    """
+    A Chromium kept open between logins, so a token refresh only costs the
+    demo login itself instead of a cold browser launch.
+
+    The driver is started on first use and restarted after any failure.
+    """
+
+    def __init__(self):
+        self.driver = None
+
+    def fetch_token(self):
+        if self.driver is None:
+            self.driver = _create_driver()
+
+        try:
+            return self._login(self.driver)
+        except Exception:
+            self.close()
+            raise
+
+    def close(self):
+        if self.driver is not None:
+            try:
+                self.driver.quit()
+            except Exception:
+                pass
+            self.driver = None
+
+    def _login(self, driver):
+        # start from a logged-out session, otherwise the old cookie is read back
+        driver.delete_all_cookies()
+        driver.get("https://d247.com/")
 
         try:
             # Wait until the login button appears
@@ -42,17 +76,19 @@ def get_cookie_token():
             driver.save_screenshot("/code/screenshot_failed.png")
             raise e
 
-        # Wait after login
-        time.sleep(5)
-
-        # Extract g_token cookie
-        g_token = None
-        for cookie in driver.get_cookies():
-            if cookie["name"] == "g_token":
-                g_token = f"{cookie['name']}={cookie['value']};"
-                break
+        # Wait for the g_token cookie set by the login (instead of a fixed sleep)
+        try:
+            return WebDriverWait(driver, 10, poll_frequency=0.2).until(_find_g_token)
+        except Exception:
+            return None
 
-        return g_token
 
+def get_cookie_token():
+    """
+    Log in with a fresh browser and return the g_token cookie ("g_token=...;").
+    """
+    browser = TokenBrowser()
+    try:
+        return browser.fetch_token()
     finally:
-        driver.quit()
+        browser.close()
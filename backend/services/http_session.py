@@ -0,0 +1,115 @@
+import os
+import threading
+from http import cookiejar
+from typing import Dict
+
+import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from backend.services import metrics
+
+_lock = threading.Lock()
+_session = None
+_session_pid = None
+_reported = {"requests": 0, "connections": 0}
+
+
+class _NoCookiesPolicy(cookiejar.DefaultCookiePolicy):
+    """
+    G_TOKEN is sent as an explicit Cookie header on every call, so the shared
+    session must not collect (and later replay) cookies set by upstream.
+    """
+
+    def set_ok(self, cookie, request):
+        return False
+
+    def return_ok(self, cookie, request):
+        return False
+
+
+def get_upstream_session() -> requests.Session:
+    """
+    Process-wide keep-alive session for upstream (d247) calls.
+
+    The connection pool is shared by every thread of the process (urllib3
+    pools are thread-safe), allows at most UPSTREAM_POOL_MAXSIZE connections
+    per host and retries connection failures.
+    A new session is built after a fork so workers never share sockets.
+    """
+    global _session, _session_pid
+
+    if _session is not None and _session_pid == os.getpid():
+        return _session
+
+    with _lock:
+        if _session is None or _session_pid != os.getpid():
+            _session = _build_session()
+            _session_pid = os.getpid()
+            _reported.update(requests=0, connections=0)
+        return _session
+
+
+def _build_session() -> requests.Session:
+    retries = Retry(
+        total=settings.UPSTREAM_MAX_RETRIES,
+        connect=settings.UPSTREAM_MAX_RETRIES,
+        read=0,
+        # 5xx answers reach the circuit breaker and hedging instead of being retried here
+        status=0,
+        # upstream POSTs are read-only queries, safe to repeat
+        allowed_methods=frozenset({"GET", "POST"}),
+        backoff_factor=settings.UPSTREAM_RETRY_BACKOFF,
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(
+        pool_connections=settings.UPSTREAM_POOL_CONNECTIONS,
+        pool_maxsize=settings.UPSTREAM_POOL_MAXSIZE,
+        pool_block=settings.UPSTREAM_POOL_BLOCK,
+        max_retries=retries,
+    )
+
+    session = requests.Session()
+    session.cookies.set_policy(_NoCookiesPolicy())
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def connection_stats() -> Dict[str, int]:
+    """
+    Requests sent and connections opened (TCP + TLS handshakes) by this process' pools.
+    """
+    totals = {"requests": 0, "connections": 0}
+    session = _session
+    if session is None:
+        return totals
+
+    for adapter in {id(a): a for a in session.adapters.values()}.values():
+        pools = adapter.poolmanager.pools
+        for key in pools.keys():
+            pool = pools.get(key)
+            if pool is not None:
+                totals["requests"] += pool.num_requests
+                totals["connections"] += pool.num_connections
+
+    totals["reused"] = max(0, totals["requests"] - totals["connections"])
+    return totals
+
+
+def report_connection_stats() -> None:
+    """
+    Add this process' new requests/handshakes since the last call to the metrics counters.
+    """
+    totals = connection_stats()
+    with _lock:
+        new_requests = max(0, totals["requests"] - _reported["requests"])
+        new_connections = max(0, totals["connections"] - _reported["connections"])
+        _reported.update(requests=totals["requests"], connections=totals["connections"])
+
+    if new_requests:
+        metrics.incr("upstream_http.requests", new_requests)
+        metrics.incr("upstream_http.connections_reused", max(0, new_requests - new_connections))
+    if new_connections:
+        metrics.incr("upstream_http.handshakes", new_connections)
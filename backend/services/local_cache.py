@@ -0,0 +1,147 @@
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Iterable, Optional, Tuple
+
+from backend.services import metrics
+from backend.services.redis_service import redis_service
+
+logger = logging.getLogger(__name__)
+
+
+class LocalCache:
+    """
+    Thread-safe in-process LRU cache with a per-entry TTL and an entry/byte budget.
+
+    Entries can additionally be dropped early through a Redis pub/sub channel
+    (see `listen_for_invalidations`), so the TTL is only the upper bound on
+    staleness when an invalidation message gets lost.
+    """
+
+    def __init__(self, name: str, ttl: float, max_entries: int, max_bytes: int,
+                 track_stats: bool = True, sizeof: Callable[[Any], int] = len):
+        self.name = name
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.track_stats = track_stats
+        self.sizeof = sizeof
+
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, Tuple[float, int, Any]]" = OrderedDict()
+        self._bytes = 0
+        self._listener_pid = None
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    # ----------------- Reads / writes -----------------
+    def get(self, key: str) -> Optional[Any]:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > now:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                hit = True
+            else:
+                if entry is not None:
+                    self._pop(key)
+                self.misses += 1
+                hit = False
+
+        if self.track_stats:
+            metrics.incr(f"{self.name}.{'hits' if hit else 'misses'}")
+        return entry[2] if hit else None
+
+    def set(self, key: str, value: Any) -> None:
+        size = self.sizeof(value)
+        if size > self.max_bytes:
+            return
+
+        evicted = 0
+        with self._lock:
+            if key in self._entries:
+                self._pop(key)
+            self._entries[key] = (time.monotonic() + self.ttl, size, value)
+            self._bytes += size
+
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._pop(oldest)
+                evicted += 1
+            self.evictions += evicted
+
+        if evicted and self.track_stats:
+            metrics.incr(f"{self.name}.evictions", evicted)
+
+    def invalidate(self, keys: Iterable[str]) -> None:
+        with self._lock:
+            for key in keys:
+                if key in self._entries:
+                    self._pop(key)
+                    self.invalidations += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
+
+    def _pop(self, key: str) -> None:
+        # caller holds the lock
+        _, size, _ = self._entries.pop(key)
+        self._bytes -= size
+
+    # ----------------- Invalidation -----------------
+    def listen_for_invalidations(self, channel: str) -> None:
+        """
+        Start (once per process) a daemon thread that evicts the keys published on `channel`.
+
+        Messages are the Redis keys that changed, separated by spaces. Checking
+        the pid makes this safe to call from forked gunicorn/celery workers.
+        """
+        if self._listener_pid == os.getpid():
+            return
+
+        with self._lock:
+            if self._listener_pid == os.getpid():
+                return
+            self._listener_pid = os.getpid()
+
+        # anything cached before the fork (or before we listened) may be stale
+        self.clear()
+
+        def handle_message(message):
+            data = message.get("data")
+            if data:
+                self.invalidate(data.split())
+
+        def handle_error(error, pubsub, thread):
+            # messages may have been missed while disconnected
+            logger.warning(f"{self.name} invalidation listener error: {error}")
+            self.clear()
+            time.sleep(1)
+
+        try:
+            pubsub = redis_service.redis_client.pubsub(ignore_subscribe_messages=True)
+            pubsub.subscribe(**{channel: handle_message})
+            pubsub.run_in_thread(sleep_time=1, daemon=True, exception_handler=handle_error)
+        except Exception as e:
+            # entries still expire after `ttl`, so serving continues with bounded staleness
+            logger.warning(f"{self.name} could not subscribe to {channel}: {e}")
+            self._listener_pid = None
@@ -0,0 +1,104 @@
+import logging
+import threading
+import time
+from typing import Any, Dict
+
+from django.conf import settings
+
+from backend.services.redis_service import redis_service
+
+logger = logging.getLogger(__name__)
+
+METRICS_COUNTERS_KEY = "metrics:counters"
+METRICS_GAUGES_KEY = "metrics:gauges"
+
+_lock = threading.Lock()
+_counters: Dict[str, float] = {}
+_gauges: Dict[str, float] = {}
+_last_flush = time.monotonic()
+
+
+def incr(name: str, amount: float = 1) -> None:
+    """
+    Add to a counter. Counters are summed across all processes.
+    """
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + amount
+    _maybe_flush()
+
+
+def set_gauge(name: str, value: Any) -> None:
+    """
+    Set a gauge. The last value written by any process wins.
+    """
+    with _lock:
+        _gauges[name] = value
+    _maybe_flush()
+
+
+def observe(name: str, value: float) -> None:
+    """
+    Record one sample of a timing/size: keeps count, sum and last value.
+    """
+    with _lock:
+        _counters[f"{name}.count"] = _counters.get(f"{name}.count", 0) + 1
+        _counters[f"{name}.sum"] = _counters.get(f"{name}.sum", 0) + value
+        _gauges[f"{name}.last"] = value
+    _maybe_flush()
+
+
+def flush() -> None:
+    """
+    Push the counters accumulated in this process to Redis and reset them.
+    """
+    global _last_flush
+    with _lock:
+        counters = dict(_counters)
+        gauges = dict(_gauges)
+        _counters.clear()
+        _last_flush = time.monotonic()
+
+    if not counters and not gauges:
+        return
+
+    try:
+        pipeline = redis_service.redis_client.pipeline(transaction=False)
+        for name, amount in counters.items():
+            pipeline.hincrbyfloat(METRICS_COUNTERS_KEY, name, amount)
+        if gauges:
+            pipeline.hset(METRICS_GAUGES_KEY, mapping=gauges)
+        pipeline.execute()
+    except Exception as e:
+        logger.warning(f"Error flushing metrics to Redis: {e}")
+
+
+def _maybe_flush() -> None:
+    if time.monotonic() - _last_flush >= getattr(settings, "METRICS_FLUSH_INTERVAL", 10):
+        flush()
+
+
+def get_metrics() -> Dict[str, Any]:
+    """
+    Read the aggregated counters and gauges of every process.
+    """
+    try:
+        pipeline = redis_service.redis_client.pipeline(transaction=False)
+        pipeline.hgetall(METRICS_COUNTERS_KEY)
+        pipeline.hgetall(METRICS_GAUGES_KEY)
+        counters, gauges = pipeline.execute()
+    except Exception as e:
+        logger.error(f"Error reading metrics from Redis: {e}")
+        counters, gauges = {}, {}
+
+    return {
+        "counters": {name: _parse_value(value) for name, value in sorted(counters.items())},
+        "gauges": {name: _parse_value(value) for name, value in sorted(gauges.items())},
+    }
+
+
+def _parse_value(value: str) -> Any:
+    # gauges may hold states such as "open"/"closed" as well as numbers
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return value
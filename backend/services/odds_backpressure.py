@@ -0,0 +1,119 @@
+import logging
+import time
+from datetime import datetime
+from typing import Iterable, List, Optional, Tuple
+
+import orjson
+import redis
+from django.conf import settings
+
+from backend.services import metrics
+from backend.services.odds_scheduler import PRIORITY_INPLAY, PRIORITY_PREMATCH, PRIORITY_STARTING, compute_priority
+
+logger = logging.getLogger(__name__)
+
+# Message header stamped on every dispatched odds task (unix time)
+DISPATCHED_AT_HEADER = "dispatched_at"
+
+# Shedding level -> lowest priority still dispatched
+SHEDDING_MIN_PRIORITY = {
+    0: PRIORITY_PREMATCH,   # everything
+    1: PRIORITY_STARTING,   # shed pre-match events opening later than an hour
+    2: PRIORITY_INPLAY,     # in-play events only
+}
+
+_broker_client = None
+
+
+def _get_broker_client() -> redis.Redis:
+    global _broker_client
+    if _broker_client is None:
+        _broker_client = redis.Redis.from_url(
+            settings.CELERY_BROKER_URL,
+            socket_connect_timeout=2,
+            socket_timeout=2,
+        )
+    return _broker_client
+
+
+def get_queue_stats() -> Tuple[int, float]:
+    """
+    Length of the Celery queue and age (seconds) of its oldest odds task.
+
+    The Redis transport LPUSHes new messages and workers pop from the right,
+    so the oldest message is the last one. Its age is read from the
+    dispatched_at header; messages without it (other tasks) count as 0.
+    """
+    client = _get_broker_client()
+    pipeline = client.pipeline(transaction=False)
+    pipeline.llen(settings.ODDS_BACKPRESSURE_QUEUE)
+    pipeline.lindex(settings.ODDS_BACKPRESSURE_QUEUE, -1)
+    depth, oldest = pipeline.execute()
+
+    lag = 0.0
+    if oldest:
+        try:
+            dispatched_at = orjson.loads(oldest).get("headers", {}).get(DISPATCHED_AT_HEADER)
+            if dispatched_at:
+                lag = max(0.0, time.time() - float(dispatched_at))
+        except (orjson.JSONDecodeError, TypeError, ValueError, AttributeError):
+            pass
+    return depth, lag
+
+
+def compute_shedding_level(depth: int, lag: float) -> int:
+    """
+    0 when workers keep up, 1 or 2 as queue depth or lag cross their thresholds.
+    """
+    if depth >= settings.ODDS_BACKPRESSURE_DEPTH_LEVEL2 or lag >= settings.ODDS_BACKPRESSURE_LAG_LEVEL2:
+        return 2
+    if depth >= settings.ODDS_BACKPRESSURE_DEPTH_LEVEL1 or lag >= settings.ODDS_BACKPRESSURE_LAG_LEVEL1:
+        return 1
+    return 0
+
+
+def get_shedding_level() -> int:
+    """
+    Current shedding level of the odds dispatcher, exported with the queue
+    depth and lag as odds_dispatch.* gauges. Falls back to 0 (no shedding)
+    when the broker cannot be read.
+    """
+    if not settings.ODDS_BACKPRESSURE_ENABLED:
+        return 0
+
+    try:
+        depth, lag = get_queue_stats()
+    except Exception as e:
+        logger.warning(f"Error reading broker queue stats: {e}")
+        return 0
+
+    level = compute_shedding_level(depth, lag)
+    metrics.set_gauge("odds_dispatch.queue_depth", depth)
+    metrics.set_gauge("odds_dispatch.queue_lag", round(lag, 3))
+    metrics.set_gauge("odds_dispatch.shedding_level", level)
+    return level
+
+
+def min_priority_for(level: Optional[int]) -> int:
+    return SHEDDING_MIN_PRIORITY.get(level or 0, PRIORITY_INPLAY)
+
+
+def shed_events(events: Iterable[Tuple[int, str, Optional[datetime]]], level: Optional[int],
+                now: Optional[float] = None) -> List[Tuple[int, str]]:
+    """
+    Drop the events below the priority kept at `level` when the adaptive
+    schedule is off.
+
+    `events` are (sport_id, event_id, open_date) rows from the database. Without
+    the schedule there is no stored in-play flag, so an event whose open date
+    has passed counts as in-play.
+    """
+    now = time.time() if now is None else now
+    min_priority = min_priority_for(level)
+    kept = []
+    for sport_id, event_id, open_date in events:
+        open_time = open_date.timestamp() if open_date else None
+        inplay = open_time is not None and open_time <= now
+        if min_priority == PRIORITY_PREMATCH or compute_priority(inplay, None, open_time, now=now) >= min_priority:
+            kept.append((sport_id, event_id))
+    return kept
@@ -0,0 +1,258 @@
+import asyncio
+import logging
+import multiprocessing
+import time
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Dict, List, Set, Tuple
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+
+from backend.services import metrics
+from backend.services.odds_ingest_service import (
+    decode_event_odds,
+    fetch_event_ciphertext,
+    init_cpu_worker,
+    refresh_event_odds,
+    store_converted_odds,
+)
+from backend.services.odds_scheduler import claim_due_events, sync_schedule
+from backend.services.odds_watch_service import select_full_refresh_events
+
+logger = logging.getLogger(__name__)
+
+
+def list_events() -> List[Tuple[int, str]]:
+    """
+    (sport_id, event_id) of every event whose odds should be refreshed.
+    """
+    from sports.models import Event
+    return list(Event.objects.values_list("sport__event_type_id", "event_id"))
+
+
+def list_due_events() -> List[Tuple[int, str]]:
+    """
+    (sport_id, event_id) of the events the adaptive schedule says are due, most overdue first.
+    """
+    sync_schedule()
+    events = claim_due_events()
+    if settings.ODDS_BULK_INGESTION_ENABLED:
+        # the others are refreshed by the sport-level highlight fetch
+        events = select_full_refresh_events(events)
+    return events
+
+
+class OddsFetchEngine:
+    """
+    Refreshes the odds of every event once per `interval` with bounded concurrency.
+
+    An asyncio loop schedules one `refresh_event_odds` (fetch + decrypt +
+    convert + store) per event on a thread pool of `concurrency` workers that
+    share the process' keep-alive upstream session. Each cycle has a
+    deadline: fetches that have not started by then are dropped rather than
+    queued behind the next cycle, and an event whose previous fetch is still running is
+    skipped, so a slow upstream can never build a backlog. Events are started
+    least-recently-refreshed first, so overloaded cycles rotate through the
+    whole catalog instead of starving its tail. With the adaptive schedule
+    enabled, a cycle only covers the events that are due.
+
+    With `cpu_workers` > 0 the refresh is split in stages: the threads only
+    fetch ciphertext (and store the result), while decryption and conversion
+    run in `cpu_workers` processes, fed through queues of at most `cpu_queue`
+    responses in total. When decoding falls behind the queues fill up and
+    fetching waits, instead of piling up ciphertext in memory. An event is
+    always decoded by the same process, so its converted markets can be
+    reused from that process' market cache.
+    """
+
+    def __init__(self, concurrency: int = 32, interval: float = 1.0, deadline: float = None,
+                 cpu_workers: int = 0, cpu_queue: int = None):
+        self.concurrency = concurrency
+        self.interval = interval
+        self.deadline = deadline or interval
+        self.cpu_workers = cpu_workers
+        self.cpu_queue = cpu_queue or 4 * cpu_workers
+
+        self.executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="odds-fetch")
+        # spawned, not forked: the parent runs threads and holds DB/Redis connections
+        self.cpu_executors = [
+            ProcessPoolExecutor(
+                max_workers=1,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=init_cpu_worker,
+            )
+            for _ in range(cpu_workers)
+        ]
+
+        self._in_flight: Set[Tuple[int, str]] = set()
+        self._last_refreshed: Dict[Tuple[int, str], float] = {}
+        self._slots: asyncio.Semaphore = None
+        self._decode_queues: List[asyncio.Queue] = []
+        self._decoders: List[asyncio.Task] = []
+
+    async def run_forever(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            started = loop.time()
+            try:
+                await self.run_cycle()
+            except Exception as e:
+                logger.error(f"Odds engine cycle failed: {e}")
+            # missed ticks are skipped, never made up
+            await asyncio.sleep(max(0.0, self.interval - (loop.time() - started)))
+
+    async def run_cycle(self) -> dict:
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.concurrency)
+        if self.cpu_executors and not self._decoders:
+            self._decode_queues = [
+                asyncio.Queue(maxsize=max(1, self.cpu_queue // self.cpu_workers)) for _ in self.cpu_executors
+            ]
+            self._decoders = [asyncio.create_task(self._decode_worker(shard)) for shard in range(self.cpu_workers)]
+
+        started = time.monotonic()
+        if settings.ODDS_SCHEDULE_ENABLED:
+            # already ordered most overdue first
+            events = await sync_to_async(list_due_events)()
+            due = [event for event in events if event not in self._in_flight]
+        else:
+            events = await sync_to_async(list_events)()
+
+            if len(self._last_refreshed) > 2 * len(events):
+                current = set(events)
+                self._last_refreshed = {event: at for event, at in self._last_refreshed.items() if event in current}
+
+            due = [event for event in events if event not in self._in_flight]
+            due.sort(key=lambda event: self._last_refreshed.get(event, 0.0))
+        skipped = len(events) - len(due)
+        refresh = self._refresh_staged if self.cpu_executors else self._refresh
+        tasks = [asyncio.create_task(refresh(sport_id, event_id)) for sport_id, event_id in due]
+
+        done, pending = await asyncio.wait(tasks, timeout=self.deadline) if tasks else (set(), set())
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+
+        failed = sum(1 for task in done if task.exception() or not task.result())
+        elapsed = time.monotonic() - started
+
+        metrics.observe("odds_engine.cycle_seconds", elapsed)
+        metrics.set_gauge("odds_engine.events", len(events))
+        metrics.incr("odds_engine.refreshed", len(done) - failed)
+        metrics.incr("odds_engine.failed", failed)
+        metrics.incr("odds_engine.dropped", len(pending) + skipped)
+        if self._decode_queues:
+            metrics.set_gauge("odds_engine.decode_queue", sum(queue.qsize() for queue in self._decode_queues))
+        if elapsed > self.interval:
+            metrics.incr("odds_engine.overruns")
+
+        summary = {
+            "events": len(events),
+            "refreshed": len(done) - failed,
+            "failed": failed,
+            "dropped": len(pending) + skipped,
+            "seconds": round(elapsed, 3),
+        }
+        logger.info(f"Odds engine cycle: {summary}")
+        return summary
+
+    async def _refresh(self, sport_id: int, event_id: str):
+        # a slot is only freed when the worker thread really finishes, so
+        # abandoned (past-deadline) fetches still count against concurrency
+        await self._slots.acquire()
+        loop = asyncio.get_running_loop()
+        key = (sport_id, event_id)
+        self._in_flight.add(key)
+
+        def finished(_future):
+            self._in_flight.discard(key)
+            try:
+                loop.call_soon_threadsafe(self._slots.release)
+            except RuntimeError:
+                pass  # loop already closed (engine shutting down)
+
+        future = self.executor.submit(self._refresh_blocking, sport_id, event_id)
+        future.add_done_callback(finished)
+        return await asyncio.wrap_future(future)
+
+    def _refresh_blocking(self, sport_id: int, event_id: str) -> bool:
+        try:
+            refreshed = refresh_event_odds(sport_id, event_id) is not None
+            self._last_refreshed[(sport_id, event_id)] = time.monotonic()
+            return refreshed
+        except Exception as e:
+            logger.warning(f"Odds refresh failed for sport_id: {sport_id}, event_id: {event_id} - {e}")
+            return False
+
+    async def _refresh_staged(self, sport_id: int, event_id: str) -> bool:
+        key = (sport_id, event_id)
+        self._in_flight.add(key)
+        # the stage (fetch thread, decode or store thread) started last; when the
+        # refresh is dropped at the deadline it may still run, and so the event
+        # stays in flight until it ends
+        stage = None
+        try:
+            stage = await self._submit_io(fetch_event_ciphertext, sport_id, event_id)
+            ciphertext = await asyncio.wrap_future(stage)
+
+            loop = asyncio.get_running_loop()
+            decoded, decode_finished = loop.create_future(), loop.create_future()
+            queue = self._decode_queues[hash(key) % len(self._decode_queues)]
+            await queue.put((sport_id, event_id, ciphertext, decoded, decode_finished))
+            stage = decode_finished
+            converted_odds = await decoded
+            if not converted_odds:
+                return False
+
+            stage = await self._submit_io(store_converted_odds, sport_id, event_id, converted_odds)
+            await asyncio.wrap_future(stage)
+            self._last_refreshed[key] = time.monotonic()
+            return True
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning(f"Odds refresh failed for sport_id: {sport_id}, event_id: {event_id} - {e}")
+            return False
+        finally:
+            if stage is None or stage.done():
+                self._in_flight.discard(key)
+            else:
+                stage.add_done_callback(lambda _future: self._in_flight.discard(key))
+
+    async def _submit_io(self, func, *args) -> Future:
+        # same slot accounting as _refresh: freed when the thread really finishes
+        await self._slots.acquire()
+        loop = asyncio.get_running_loop()
+
+        def finished(_future):
+            try:
+                loop.call_soon_threadsafe(self._slots.release)
+            except RuntimeError:
+                pass  # loop already closed (engine shutting down)
+
+        future = self.executor.submit(func, *args)
+        future.add_done_callback(finished)
+        return future
+
+    async def _decode_worker(self, shard: int) -> None:
+        loop = asyncio.get_running_loop()
+        queue, executor = self._decode_queues[shard], self.cpu_executors[shard]
+        while True:
+            sport_id, event_id, ciphertext, decoded, decode_finished = await queue.get()
+            try:
+                if decoded.cancelled():
+                    continue  # its refresh was dropped at the cycle deadline
+                started = time.monotonic()
+                result = await loop.run_in_executor(
+                    executor, decode_event_odds, sport_id, event_id, ciphertext
+                )
+                metrics.observe("odds_engine.decode_seconds", time.monotonic() - started)
+                if not decoded.done():
+                    decoded.set_result(result)
+            except Exception as e:
+                if not decoded.done():
+                    decoded.set_exception(e)
+            finally:
+                decode_finished.set_result(None)
+                queue.task_done()
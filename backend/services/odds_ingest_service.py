@@ -0,0 +1,107 @@
+import os
+from typing import Dict, Optional
+
+from django.conf import settings
+
+from backend.services import metrics
+from backend.services.covert_odds_data import build_odds_event, split_highlight_by_event
+from backend.services.crypt_service import get_codec
+from backend.services.odds_model import OddsEvent
+from backend.services.odds_scheduler import record_refresh, record_refresh_time
+from backend.services.odds_watch_service import select_full_refresh_events
+from backend.services.scaper_service import get_highlight_home_private, get_odds_ciphertext
+from backend.services.store_odds_service import store_event_odds
+
+
+def refresh_event_odds(sport_id: int, event_id: int, session=None) -> Optional[bool]:
+    """
+    Fetch, decrypt, convert and store the odds of one event.
+
+    Shared by the per-event Celery task and the asyncio fetch engine. With the
+    adaptive schedule enabled, the event's next refresh is planned from the
+    fetched odds.
+
+    Returns whether the odds changed, or None when upstream returned nothing usable.
+    """
+    ciphertext = fetch_event_ciphertext(sport_id, event_id, session=session)
+    converted_odds = decode_event_odds(sport_id, event_id, ciphertext)
+    if not converted_odds:
+        return None
+    return store_converted_odds(sport_id, event_id, converted_odds)
+
+
+def fetch_event_ciphertext(sport_id: int, event_id: int, session=None) -> str:
+    """
+    I/O stage: the encrypted odds of one event, straight from upstream.
+    """
+    return get_odds_ciphertext(sport_id, event_id, os.getenv("DECRYPTION_KEY"), session=session)
+
+
+def decode_event_odds(sport_id: int, event_id: int, ciphertext: str) -> Optional[OddsEvent]:
+    """
+    CPU stage: decrypt and convert the odds of one event.
+
+    Picklable and free of shared state, so the fetch engine can run it in
+    its process pool (see init_cpu_worker). Returns None when the odds are
+    empty.
+    """
+    raw_odds = get_codec(os.getenv("DECRYPTION_KEY")).decrypt(ciphertext)
+    if not raw_odds:
+        return None
+    return build_odds_event(raw_odds, sport_id=sport_id, event_id=event_id)
+
+
+def store_converted_odds(sport_id: int, event_id: int, converted_odds: OddsEvent) -> bool:
+    """
+    Store converted odds and plan the event's next refresh. Returns whether they changed.
+    """
+    changed = store_event_odds(sport_id, event_id, converted_odds)
+    if settings.ODDS_SCHEDULE_ENABLED:
+        record_refresh(sport_id, event_id, converted_odds, changed)
+    elif settings.ODDS_BULK_INGESTION_ENABLED:
+        record_refresh_time(sport_id, event_id, converted_odds)
+    return changed
+
+
+def init_cpu_worker() -> None:
+    """
+    Initializer of the fetch engine's (spawned) decode processes.
+    """
+    import django
+    django.setup()
+
+
+def refresh_sport_highlights(sport_id: int, session=None) -> Optional[Dict[str, int]]:
+    """
+    Refresh the headline markets of every event of a sport with one
+    highlighthomePrivate call.
+
+    Events that need their full markets (in play or watched by a client, see
+    select_full_refresh_events) are left to the per-event fetch, so their
+    stored documents are never replaced by the headline-only ones.
+    Returns counts of events seen/changed/skipped, or None when upstream
+    returned nothing usable.
+    """
+    highlight = get_highlight_home_private(sport_id, os.getenv("DECRYPTION_KEY"), session=session)
+    entries_by_event = split_highlight_by_event(highlight)
+    if not entries_by_event:
+        return None
+
+    full_refresh = set(select_full_refresh_events((sport_id, event_id) for event_id in entries_by_event))
+    summary = {"events": len(entries_by_event), "changed": 0, "skipped": len(full_refresh)}
+
+    for event_id, entries in entries_by_event.items():
+        if (sport_id, event_id) in full_refresh:
+            continue
+
+        converted_odds = build_odds_event({"data": entries}, sport_id=sport_id, event_id=event_id)
+        if not converted_odds:
+            continue
+
+        changed = store_converted_odds(sport_id, event_id, converted_odds)
+        summary["changed"] += int(changed)
+
+    metrics.incr("odds_bulk.events", summary["events"] - summary["skipped"])
+    metrics.incr("odds_bulk.changed", summary["changed"])
+    metrics.incr("odds_bulk.skipped", summary["skipped"])
+    return summary
@@ -0,0 +1,61 @@
+import logging
+import uuid
+from typing import Dict, Iterable, Optional, Tuple
+
+from django.conf import settings
+
+from backend.services import metrics
+from backend.services.redis_service import redis_service
+
+logger = logging.getLogger(__name__)
+
+
+def get_fetch_lease_key(sport_id: int, event_id) -> str:
+    """
+    Redis key held while an odds fetch of the event is queued or running.
+    """
+    return f"odds:lease:{sport_id}:{event_id}"
+
+
+def acquire_fetch_leases(events: Iterable[Tuple[int, str]]) -> Dict[Tuple[int, str], str]:
+    """
+    Take the fetch lease of every event that has no fetch queued or running.
+
+    All leases are requested in one pipelined round trip (SET NX EX). Returns
+    event -> lease token for the events that may be dispatched; the others are
+    counted as coalesced. The lease expires after ODDS_FETCH_LEASE_TTL so a
+    lost task can only block its event that long.
+    """
+    events = list(events)
+    if not events:
+        return {}
+
+    tokens = {event: uuid.uuid4().hex for event in events}
+    try:
+        pipeline = redis_service.redis_client.pipeline(transaction=False)
+        for (sport_id, event_id), token in tokens.items():
+            pipeline.set(get_fetch_lease_key(sport_id, event_id), token,
+                         ex=int(settings.ODDS_FETCH_LEASE_TTL), nx=True)
+        acquired = pipeline.execute()
+    except Exception as e:
+        # without Redis the fetches would fail anyway; dispatch nothing
+        logger.error(f"Error acquiring odds fetch leases: {e}")
+        return {}
+
+    leases = {event: token for (event, token), ok in zip(tokens.items(), acquired) if ok}
+    metrics.incr("odds_dispatch.queued", len(leases))
+    metrics.incr("odds_dispatch.coalesced", len(events) - len(leases))
+    return leases
+
+
+def release_fetch_lease(sport_id: int, event_id, token: Optional[str]) -> bool:
+    """
+    Release a fetch lease once its fetch finished. Returns False when the lease
+    had already expired or been taken over.
+
+    Only deletes the lease while it still holds `token`, so a fetch that
+    outlived its lease can never release the lease of the next dispatch.
+    """
+    if not token:
+        return False
+    return redis_service.delete_if_equal(get_fetch_lease_key(sport_id, event_id), token)
@@ -0,0 +1,162 @@
+from typing import Any, Dict, List, Optional
+
+import orjson
+
+# Converted odds as a market JSON cache for the ingestion path: each market is
+# serialized once when it is built, and storage, fingerprints and deltas reuse
+# those bytes. Runners and ladders stay inside the JSON; there are no runner
+# objects or numeric ladders. The API never sees these objects: views filter
+# and compact the JSON documents they read back from Redis.
+
+
+class OddsMarket:
+    """
+    JSON cache of one converted market (the API shape), plus the few fields
+    storage and diffing look at. Runners only exist inside the JSON.
+    """
+
+    __slots__ = ("market_id", "name", "group", "status", "_json")
+
+    def __init__(self, market_id: str, name: str, group: str, status: Any, body: bytes):
+        self.market_id = market_id
+        self.name = name
+        self.group = group
+        self.status = status
+        self._json = body
+
+    @classmethod
+    def from_raw(cls, event: Dict[str, Any], market_type: str) -> Optional["OddsMarket"]:
+        """
+        Build a market from one raw upstream market, or None when it has no runners.
+
+        The API-shaped dicts are only built here, to serialize the market
+        once; the object keeps that JSON, not the dicts.
+        """
+        mname = event.get("mname", "")
+        market = {
+            "marketId": str(event.get("mid", "")),
+            "market": mname,
+            "status": event.get("status", ""),
+            "inplay": event.get("iplay", False),
+            "totalMatched": None,
+            "active": None,
+            "markettype": market_type,
+            "min": str(event.get("min", "")),
+            "max": str(event.get("max", "")),
+            "runners": []
+        }
+
+        for section in event["section"]:
+            if not section or not isinstance(section, dict):
+                continue
+
+            name = section.get("nat", "").strip()
+            runner = {
+                "runnerName": name,
+                "selectionId": section.get("sid", 0),
+                "status": section.get("gstatus", ""),
+                "back": [],
+                "lay": [],
+                "runner": name
+            }
+
+            if section.get("odds") and isinstance(section["odds"], list):
+                # one pass over the ladder; levels count per side, in source order
+                for odd in section["odds"]:
+                    side = odd.get("otype")
+                    if side != "back" and side != "lay":
+                        continue
+                    rate = odd.get("odds", 0)
+                    if not rate > 0:
+                        continue
+                    ladder = runner[side]
+                    ladder.append({
+                        "rate": str(rate),
+                        "size": odd.get("size", 0),
+                        "price": None,
+                        "level": len(ladder)
+                    })
+
+            market["runners"].append(runner)
+
+        if not market["runners"]:
+            return None
+
+        return cls(
+            market_id=market["marketId"],
+            name=mname,
+            group=mname.strip() if mname else "unknown",
+            status=market["status"],
+            body=orjson.dumps(market, option=orjson.OPT_NON_STR_KEYS),
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        return orjson.loads(self._json)
+
+    def json(self) -> bytes:
+        return self._json
+
+
+class OddsEvent:
+    """
+    Converted odds of one event: header fields plus its cached markets in
+    source order. `to_dict` gives the dict convert_odds_format always returned.
+    """
+
+    __slots__ = ("eventid", "event_name", "status", "inplay", "sport_name", "sport_id", "event_id", "markets")
+
+    def __init__(self, eventid: str, event_name: str, inplay: Any, sport_name: Optional[str],
+                 sport_id: Any, event_id: Any, markets: List[OddsMarket]):
+        self.eventid = eventid
+        self.event_name = event_name
+        self.status = "ACTIVE"
+        self.inplay = inplay
+        self.sport_name = sport_name
+        self.sport_id = sport_id
+        self.event_id = event_id
+        self.markets = markets
+
+    def header(self) -> Dict[str, Any]:
+        return {
+            "eventid": self.eventid,
+            "eventName": self.event_name,
+            "updateTime": None,
+            "status": self.status,
+            "inplay": self.inplay,
+            "sport": {"name": self.sport_name},
+            "sportId": self.sport_id,
+            "eventId": self.event_id,
+            "isLiveStream": None,
+        }
+
+    def get(self, field: str, default: Any = None) -> Any:
+        """
+        Dict-style read of a header field, for code written against the dict document.
+        """
+        return self.header().get(field, default)
+
+    def market_groups(self) -> Dict[str, List[OddsMarket]]:
+        groups: Dict[str, List[OddsMarket]] = {}
+        for market in self.markets:
+            groups.setdefault(market.group, []).append(market)
+        return groups
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            **self.header(),
+            "markets": {
+                group: [market.to_dict() for market in markets]
+                for group, markets in self.market_groups().items()
+            },
+        }
+
+
+def encode_odds(value: Any) -> Any:
+    """
+    orjson `default` hook: embeds the cached JSON of OddsMarket objects, so
+    documents holding them serialize without re-encoding their markets.
+    """
+    if isinstance(value, OddsMarket):
+        return orjson.Fragment(value.json())
+    raise TypeError
+
@@ -0,0 +1,235 @@
+import logging
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import orjson
+from django.conf import settings
+
+from backend.services import metrics
+from backend.services.redis_service import redis_service
+from backend.services.store_odds_service import (
+    ODDS_TTL, get_odds_fingerprint_key, get_odds_index_key, get_odds_key, get_odds_projection_key,
+)
+
+logger = logging.getLogger(__name__)
+
+# Sorted set of "{sport_id}:{event_id}" scored by the unix time the event is next due
+ODDS_SCHEDULE_KEY = "odds:schedule"
+
+# Per-event polling state ({"interval", "unchanged", "priority", "at"}) and event open dates (unix time)
+ODDS_SCHEDULE_STATE_KEY = "odds:schedule:state"
+ODDS_SCHEDULE_OPEN_KEY = "odds:schedule:open"
+
+# Present while the schedule is in sync with the Event table
+ODDS_SCHEDULE_SYNCED_KEY = "odds:schedule:synced"
+
+# Dispatch priorities, shed lowest first under backpressure (see odds_backpressure)
+PRIORITY_PREMATCH = 0
+PRIORITY_STARTING = 1  # opens within the hour
+PRIORITY_INPLAY = 2
+
+
+def _member(sport_id: int, event_id) -> str:
+    return f"{sport_id}:{event_id}"
+
+
+def _parse_member(member: str) -> Tuple[int, str]:
+    sport_id, event_id = member.split(":", 1)
+    return int(sport_id), event_id
+
+
+def compute_interval(inplay: bool, status: Optional[str], open_time: Optional[float],
+                     unchanged: int = 0, now: Optional[float] = None) -> float:
+    """
+    Seconds until an event's odds should be fetched again.
+
+    In-play events are polled at the in-play interval whether or not their
+    odds moved. Pre-match events are polled faster the closer they are to
+    their open date, and back off while their odds stay unchanged. Suspended
+    pre-match events back off by a constant factor (an in-play event is
+    "SUSPENDED" as soon as any of its markets is, so it is never slowed
+    down) and closed events are only checked occasionally.
+    """
+    now = time.time() if now is None else now
+    status = (status or "").upper()
+
+    if status == "CLOSED":
+        return settings.ODDS_SCHEDULE_CLOSED_INTERVAL
+
+    if inplay:
+        return settings.ODDS_SCHEDULE_INPLAY_INTERVAL
+
+    if open_time is None:
+        interval = settings.ODDS_SCHEDULE_PREMATCH_INTERVAL
+    elif open_time - now <= 3600:
+        # starting within the hour, or due to go in play any moment
+        interval = settings.ODDS_SCHEDULE_STARTING_INTERVAL
+    elif open_time - now <= 86400:
+        interval = settings.ODDS_SCHEDULE_PREMATCH_INTERVAL
+    else:
+        interval = settings.ODDS_SCHEDULE_FUTURE_INTERVAL
+    interval *= settings.ODDS_SCHEDULE_UNCHANGED_BACKOFF ** unchanged
+
+    if status == "SUSPENDED":
+        interval *= settings.ODDS_SCHEDULE_SUSPENDED_BACKOFF
+
+    return min(interval, settings.ODDS_SCHEDULE_MAX_INTERVAL)
+
+
+def compute_priority(inplay: bool, status: Optional[str], open_time: Optional[float],
+                     now: Optional[float] = None) -> int:
+    """
+    How important it is to keep an event's odds fresh when workers cannot keep up.
+    """
+    now = time.time() if now is None else now
+    if (status or "").upper() == "CLOSED":
+        return PRIORITY_PREMATCH
+    if inplay:
+        return PRIORITY_INPLAY
+    if open_time is not None and open_time - now <= 3600:
+        return PRIORITY_STARTING
+    return PRIORITY_PREMATCH
+
+
+def sync_schedule(force: bool = False) -> Optional[int]:
+    """
+    Add new events to the schedule (due immediately) and drop deleted ones.
+
+    Runs at most once per ODDS_SCHEDULE_SYNC_INTERVAL across all processes
+    unless forced. Returns the number of scheduled events, or None when the
+    sync was skipped.
+    """
+    from sports.models import Event
+
+    if not force and not redis_service.set_if_absent(
+        ODDS_SCHEDULE_SYNCED_KEY, 1, expire=int(settings.ODDS_SCHEDULE_SYNC_INTERVAL)
+    ):
+        return None
+
+    now = time.time()
+    open_times = {}
+    for sport_id, event_id, open_date in Event.objects.values_list(
+        "sport__event_type_id", "event_id", "event_open_date"
+    ):
+        if sport_id is None or not event_id:
+            continue
+        open_times[_member(sport_id, event_id)] = open_date.timestamp() if open_date else ""
+
+    try:
+        client = redis_service.redis_client
+        scheduled = set(client.zrange(ODDS_SCHEDULE_KEY, 0, -1))
+        stale = list(scheduled - open_times.keys())
+
+        pipeline = client.pipeline(transaction=False)
+        if open_times:
+            pipeline.zadd(ODDS_SCHEDULE_KEY, {member: now for member in open_times}, nx=True)
+            pipeline.hset(ODDS_SCHEDULE_OPEN_KEY, mapping=open_times)
+        if stale:
+            pipeline.zrem(ODDS_SCHEDULE_KEY, *stale)
+            pipeline.hdel(ODDS_SCHEDULE_STATE_KEY, *stale)
+            pipeline.hdel(ODDS_SCHEDULE_OPEN_KEY, *stale)
+        pipeline.execute()
+    except Exception as e:
+        logger.error(f"Error syncing odds schedule: {e}")
+        redis_service.delete_data(ODDS_SCHEDULE_SYNCED_KEY)
+        return None
+
+    metrics.set_gauge("odds_schedule.scheduled", len(open_times))
+    return len(open_times)
+
+
+def claim_due_events(limit: Optional[int] = None, min_priority: int = PRIORITY_PREMATCH) -> List[Tuple[int, str]]:
+    """
+    (sport_id, event_id) of the events whose refresh is due, most overdue first.
+
+    Claimed events are pushed one interval ahead straight away, so a fetch
+    that fails or never runs is simply retried at its next regular slot.
+    Due events below `min_priority` are shed: they are left due and come
+    first once the pressure is gone. Events never fetched yet count as in-play.
+    """
+    now = time.time()
+    try:
+        client = redis_service.redis_client
+        members = client.zrangebyscore(
+            ODDS_SCHEDULE_KEY, "-inf", now,
+            start=0 if limit else None, num=limit,
+        )
+        if not members:
+            return []
+
+        states = client.hmget(ODDS_SCHEDULE_STATE_KEY, members)
+        next_due = {}
+        for member, state in zip(members, states):
+            state = orjson.loads(state) if state else {}
+            if state.get("priority", PRIORITY_INPLAY) < min_priority:
+                continue
+            next_due[member] = now + state.get("interval", settings.ODDS_SCHEDULE_INPLAY_INTERVAL)
+        if next_due:
+            client.zadd(ODDS_SCHEDULE_KEY, next_due, xx=True)
+    except Exception as e:
+        logger.error(f"Error claiming due events from odds schedule: {e}")
+        return []
+
+    metrics.incr("odds_schedule.dispatched", len(next_due))
+    metrics.incr("odds_schedule.shed", len(members) - len(next_due))
+    return [_parse_member(member) for member in next_due]
+
+
+def record_refresh(sport_id: int, event_id, document: Dict[str, Any], changed: bool) -> Optional[float]:
+    """
+    Reschedule an event after its odds were fetched and stored.
+
+    The stored odds are kept for ODDS_TTL past the next refresh, so slowly
+    polled events do not expire between two fetches. Returns the new interval.
+    """
+    member = _member(sport_id, event_id)
+    try:
+        client = redis_service.redis_client
+        pipeline = client.pipeline(transaction=False)
+        pipeline.hget(ODDS_SCHEDULE_STATE_KEY, member)
+        pipeline.hget(ODDS_SCHEDULE_OPEN_KEY, member)
+        state, open_time = pipeline.execute()
+
+        # the interval is capped anyway, this only keeps the exponent bounded
+        unchanged = 0 if changed else min((orjson.loads(state).get("unchanged", 0) if state else 0) + 1, 32)
+        open_time = float(open_time) if open_time else None
+        interval = compute_interval(document.get("inplay"), document.get("status"), open_time, unchanged)
+        priority = compute_priority(document.get("inplay"), document.get("status"), open_time)
+
+        ttl = int(interval) + ODDS_TTL
+        pipeline = client.pipeline(transaction=False)
+        pipeline.hset(ODDS_SCHEDULE_STATE_KEY, member, orjson.dumps({
+            "interval": interval,
+            "unchanged": unchanged,
+            "priority": priority,
+            "at": time.time(),
+        }))
+        pipeline.zadd(ODDS_SCHEDULE_KEY, {member: time.time() + interval}, xx=True)
+        pipeline.expire(get_odds_key(sport_id, event_id), ttl)
+        pipeline.expire(get_odds_index_key(event_id), ttl)
+        pipeline.expire(get_odds_fingerprint_key(event_id), ttl)
+        pipeline.expire(get_odds_projection_key(event_id), ttl)
+        pipeline.execute()
+    except Exception as e:
+        logger.warning(f"Error rescheduling event {event_id}: {e}")
+        return None
+
+    metrics.observe("odds_schedule.interval", interval)
+    return interval
+
+
+def record_refresh_time(sport_id: int, event_id, document: Dict[str, Any]) -> None:
+    """
+    Record when an event was refreshed and its priority, without rescheduling it.
+
+    Used instead of record_refresh while the adaptive schedule is off, so bulk
+    ingestion (select_full_refresh_events) still knows which events the
+    highlight fetch keeps fresh.
+    """
+    try:
+        redis_service.redis_client.hset(ODDS_SCHEDULE_STATE_KEY, _member(sport_id, event_id), orjson.dumps({
+            "priority": compute_priority(document.get("inplay"), document.get("status"), None),
+            "at": time.time(),
+        }))
+    except Exception as e:
+        logger.warning(f"Error recording refresh of event {event_id}: {e}")
@@ -0,0 +1,125 @@
+import asyncio
+import logging
+from collections import defaultdict
+from typing import Dict, Iterable, Optional, Set
+
+import orjson
+import redis.asyncio as aioredis
+from django.conf import settings
+
+from backend.services.store_odds_service import ODDS_UPDATES_CHANNEL_PREFIX
+
+logger = logging.getLogger(__name__)
+
+
+class OddsSubscriber:
+    """
+    One streaming client: the events it follows and the deltas queued for it.
+
+    When the client reads slower than odds change, its queue fills up; instead
+    of buffering without bound the queue is dropped and `resync` is set so the
+    stream sends a fresh snapshot.
+    """
+    __slots__ = ("event_ids", "queue", "resync")
+
+    def __init__(self, event_ids: Iterable[str], queue_size: int):
+        self.event_ids: Set[str] = set(event_ids)
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.resync = False
+
+    def push(self, event_id: str, delta: dict) -> None:
+        if self.resync:
+            return
+        try:
+            self.queue.put_nowait((event_id, delta))
+        except asyncio.QueueFull:
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.resync = True
+            self.queue.put_nowait((None, None))  # wake the reader up
+
+
+class OddsStreamHub:
+    """
+    Fans odds deltas out to every streaming client of this process.
+
+    A single pattern subscription to `odds:updates:*` is shared by all
+    subscribers, so the number of Redis connections does not grow with the
+    number of clients. Each delta is decoded once and handed to the queues of
+    the subscribers following that event.
+    """
+
+    def __init__(self):
+        self._subscribers: Dict[str, Set[OddsSubscriber]] = defaultdict(set)
+        self._reader: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def subscribe(self, event_ids: Iterable[str]) -> OddsSubscriber:
+        self._ensure_reader()
+        subscriber = OddsSubscriber(event_ids, settings.ODDS_STREAM_QUEUE_SIZE)
+        for event_id in subscriber.event_ids:
+            self._subscribers[event_id].add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber: OddsSubscriber) -> None:
+        for event_id in subscriber.event_ids:
+            followers = self._subscribers.get(event_id)
+            if followers is not None:
+                followers.discard(subscriber)
+                if not followers:
+                    del self._subscribers[event_id]
+
+    @property
+    def subscriber_count(self) -> int:
+        return len({subscriber for followers in self._subscribers.values() for subscriber in followers})
+
+    def _ensure_reader(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._reader is not None and not self._reader.done() and self._loop is loop:
+            return
+        self._loop = loop
+        self._reader = loop.create_task(self._read_updates())
+
+    async def _read_updates(self) -> None:
+        while True:
+            client = aioredis.Redis(
+                host=getattr(settings, 'REDIS_HOST', 'redis'),
+                port=getattr(settings, 'REDIS_PORT', 6379),
+                db=getattr(settings, 'REDIS_DB', 0),
+                socket_connect_timeout=5,
+            )
+            pubsub = client.pubsub(ignore_subscribe_messages=True)
+            try:
+                await pubsub.psubscribe(f"{ODDS_UPDATES_CHANNEL_PREFIX}*")
+                async for message in pubsub.listen():
+                    if message.get("type") != "pmessage":
+                        continue
+                    channel = message["channel"].decode("utf-8")
+                    event_id = channel[len(ODDS_UPDATES_CHANNEL_PREFIX):]
+                    followers = self._subscribers.get(event_id)
+                    if not followers:
+                        continue
+                    delta = orjson.loads(message["data"])
+                    for subscriber in list(followers):
+                        subscriber.push(event_id, delta)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Odds stream reader error, reconnecting: {e}")
+                # deltas may have been missed while disconnected
+                for followers in self._subscribers.values():
+                    for subscriber in followers:
+                        subscriber.resync = True
+                        if subscriber.queue.empty():
+                            subscriber.queue.put_nowait((None, None))
+                await asyncio.sleep(1)
+            finally:
+                try:
+                    await pubsub.aclose()
+                    await client.aclose()
+                except Exception:
+                    pass
+
+
+# One hub per process (streams are served by the ASGI workers)
+odds_stream_hub = OddsStreamHub()
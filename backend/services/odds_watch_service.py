@@ -0,0 +1,121 @@
+import logging
+import threading
+import time
+from typing import Dict, Iterable, List, Set, Tuple
+
+import orjson
+from django.conf import settings
+
+from backend.services.odds_scheduler import (
+    ODDS_SCHEDULE_KEY,
+    ODDS_SCHEDULE_STATE_KEY,
+    PRIORITY_INPLAY,
+)
+from backend.services.redis_service import redis_service
+from backend.services.store_odds_service import get_odds_index_key
+
+logger = logging.getLogger(__name__)
+
+# Sorted set of event_id scored by the last time a client asked for its odds
+ODDS_WATCHED_KEY = "odds:watched"
+
+_lock = threading.Lock()
+_last_marked: Dict[str, float] = {}
+
+
+def mark_events_watched(event_ids: Iterable) -> None:
+    """
+    Record that clients are looking at these events, so they get the full
+    per-event odds instead of the sport-level highlight markets.
+
+    Each process writes an event at most once per ODDS_WATCH_MARK_INTERVAL.
+    Events that were not watched before are made due in the schedule right
+    away, so their full markets show up without waiting for a pre-match slot.
+    """
+    if not settings.ODDS_BULK_INGESTION_ENABLED:
+        return
+
+    now = time.time()
+    with _lock:
+        if len(_last_marked) > 10000:
+            _last_marked.clear()
+        event_ids = [
+            str(event_id) for event_id in event_ids
+            if now - _last_marked.get(str(event_id), 0.0) >= settings.ODDS_WATCH_MARK_INTERVAL
+        ]
+        for event_id in event_ids:
+            _last_marked[event_id] = now
+    if not event_ids:
+        return
+
+    try:
+        client = redis_service.redis_client
+        pipeline = client.pipeline(transaction=False)
+        for event_id in event_ids:
+            pipeline.zscore(ODDS_WATCHED_KEY, event_id)
+        pipeline.zadd(ODDS_WATCHED_KEY, {event_id: now for event_id in event_ids})
+        *scores, _ = pipeline.execute()
+
+        newly_watched = [
+            event_id for event_id, score in zip(event_ids, scores)
+            if score is None or now - score > settings.ODDS_WATCH_TTL
+        ]
+        if newly_watched:
+            _make_due(newly_watched, now)
+    except Exception as e:
+        logger.warning(f"Error marking events as watched: {e}")
+
+
+def _make_due(event_ids: List[str], now: float) -> None:
+    # the schedule is keyed by "{sport_id}:{event_id}"; the index entry knows the odds key "odds:{sport_id}:{event_id}"
+    indexes = redis_service.get_multiple_raw([get_odds_index_key(event_id) for event_id in event_ids])
+    due = {}
+    for raw in indexes.values():
+        if raw:
+            odds_key = orjson.loads(raw).get("key", "")
+            due[odds_key[len("odds:"):]] = now
+    if due:
+        redis_service.redis_client.zadd(ODDS_SCHEDULE_KEY, due, xx=True)
+
+
+def get_watched_event_ids() -> Set[str]:
+    """
+    Events some client asked for within the last ODDS_WATCH_TTL seconds.
+    """
+    client = redis_service.redis_client
+    cutoff = time.time() - settings.ODDS_WATCH_TTL
+    pipeline = client.pipeline(transaction=False)
+    pipeline.zremrangebyscore(ODDS_WATCHED_KEY, "-inf", cutoff)
+    pipeline.zrangebyscore(ODDS_WATCHED_KEY, cutoff, "+inf")
+    _, watched = pipeline.execute()
+    return set(watched)
+
+
+def select_full_refresh_events(events: Iterable[Tuple[int, str]]) -> List[Tuple[int, str]]:
+    """
+    Keep the events that need the per-event (gamedataPrivate) fetch: those in
+    play and those watched by a client. Events never fetched yet, or not
+    refreshed by anything for ODDS_BULK_STALE_AFTER seconds (e.g. missing
+    from the highlight response), are kept as well. The others are covered
+    by the sport-level highlight fetch.
+    """
+    events = list(events)
+    if not events:
+        return []
+
+    watched = get_watched_event_ids()
+    states = redis_service.redis_client.hmget(
+        ODDS_SCHEDULE_STATE_KEY, [f"{sport_id}:{event_id}" for sport_id, event_id in events]
+    )
+    stale_before = time.time() - settings.ODDS_BULK_STALE_AFTER
+    selected = []
+    for event, state in zip(events, states):
+        state = orjson.loads(state) if state else None
+        if (
+            state is None
+            or str(event[1]) in watched
+            or state.get("priority") == PRIORITY_INPLAY
+            or state.get("at", 0) < stale_before
+        ):
+            selected.append(event)
+    return selected
@@ -1,5 +1,5 @@
 # redis_service.py
-import json
+import orjson
 import redis
 from django.conf import settings
 from typing import Any, Optional, List, Dict
@@ -7,6 +7,21 @@ import logging
 
 logger = logging.getLogger(__name__)
 
+
+def _dumps(data: Any) -> bytes:
+    """Serialize data to UTF-8 JSON bytes (orjson, non-ASCII kept as-is)"""
+    return orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS)
+
+
+# Deletes a key only while it still holds the caller's value (lock/lease release)
+_DELETE_IF_EQUAL_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("del", KEYS[1])
+end
+return 0
+"""
+
+
 class RedisService:
     def __init__(self):
         """Initialize Redis connection"""
@@ -19,6 +34,16 @@ class RedisService:
             socket_timeout=5,
             retry_on_timeout=True
         )
+        # same server, values returned as bytes (gzipped odds documents are not text)
+        self.binary_client = redis.Redis(
+            host=getattr(settings, 'REDIS_HOST', 'redis'),
+            port=getattr(settings, 'REDIS_PORT', 6379),
+            db=getattr(settings, 'REDIS_DB', 0),
+            socket_connect_timeout=5,
+            socket_timeout=5,
+            retry_on_timeout=True
+        )
+        self._delete_if_equal = self.redis_client.register_script(_DELETE_IF_EQUAL_SCRIPT)
     
     def set_data(self, key: str, data: Any, expire: int = None) -> bool:
         """
@@ -34,7 +59,7 @@ class RedisService:
         """
         try:
             # Serialize data to JSON
-            json_data = json.dumps(data, ensure_ascii=False)
+            json_data = _dumps(data)
             
             # Store in Redis
             result = self.redis_client.set(key, json_data)
@@ -63,13 +88,87 @@ class RedisService:
         try:
             data = self.redis_client.get(key)
             if data:
-                return json.loads(data)
+                return orjson.loads(data)
             return None
             
         except Exception as e:
             logger.error(f"Error retrieving data from Redis key {key}: {e}")
             return None
     
+    def get_raw(self, key: str) -> Optional[str]:
+        """
+        Retrieve the stored JSON text of a key without deserializing it
+
+        Args:
+            key: Redis key
+
+        Returns:
+            JSON string or None if not found/error
+        """
+        try:
+            return self.redis_client.get(key) or None
+
+        except Exception as e:
+            logger.error(f"Error retrieving raw data from Redis key {key}: {e}")
+            return None
+
+    def get_multiple_raw(self, keys: List[str]) -> Dict[str, Optional[str]]:
+        """
+        Retrieve the stored JSON text of multiple keys without deserializing it
+
+        Args:
+            keys: List of Redis keys
+
+        Returns:
+            Dictionary with key -> JSON string (None if missing)
+        """
+        try:
+            if not keys:
+                return {}
+            results = self.redis_client.mget(keys)
+            return {key: results[i] or None for i, key in enumerate(keys)}
+
+        except Exception as e:
+            logger.error(f"Error retrieving multiple raw keys from Redis: {e}")
+            return {}
+
+    def get_bytes(self, key: str) -> Optional[bytes]:
+        """
+        Retrieve the stored value of a key as bytes, for values that may not be text
+
+        Args:
+            key: Redis key
+
+        Returns:
+            bytes or None if not found/error
+        """
+        try:
+            return self.binary_client.get(key) or None
+
+        except Exception as e:
+            logger.error(f"Error retrieving bytes from Redis key {key}: {e}")
+            return None
+
+    def get_multiple_bytes(self, keys: List[str]) -> Dict[str, Optional[bytes]]:
+        """
+        Retrieve the stored values of multiple keys as bytes with one MGET
+
+        Args:
+            keys: List of Redis keys
+
+        Returns:
+            Dictionary with key -> bytes (None if missing)
+        """
+        try:
+            if not keys:
+                return {}
+            results = self.binary_client.mget(keys)
+            return {key: results[i] or None for i, key in enumerate(keys)}
+
+        except Exception as e:
+            logger.error(f"Error retrieving multiple byte keys from Redis: {e}")
+            return {}
+
     def get_multiple_data(self, keys: List[str]) -> Dict[str, Any]:
         """
         Retrieve multiple keys from Redis efficiently
@@ -95,8 +194,8 @@ class RedisService:
             for i, key in enumerate(keys):
                 if results[i]:
                     try:
-                        data_dict[key] = json.loads(results[i])
-                    except json.JSONDecodeError:
+                        data_dict[key] = orjson.loads(results[i])
+                    except orjson.JSONDecodeError:
                         logger.warning(f"Invalid JSON data for key {key}")
                         data_dict[key] = None
                 else:
@@ -107,7 +206,177 @@ class RedisService:
         except Exception as e:
             logger.error(f"Error retrieving multiple keys from Redis: {e}")
             return {}
-    
+
+    def set_multiple_data(self, mapping: Dict[str, Any], expire: int = None) -> bool:
+        """
+        Store multiple keys in Redis in a single round trip
+
+        Args:
+            mapping: Dictionary of key -> data (each value will be JSON serialized)
+            expire: Expiration time in seconds, applied to every key
+
+        Returns:
+            bool: True if all keys were stored, False otherwise
+        """
+        return self.set_multiple_raw({key: _dumps(data) for key, data in mapping.items()}, expire=expire)
+
+    def set_multiple_raw(self, mapping: Dict[str, Any], expire: int = None) -> bool:
+        """
+        Store multiple already-serialized values in Redis in a single round trip
+
+        Args:
+            mapping: Dictionary of key -> JSON text (str or bytes)
+            expire: Expiration time in seconds, applied to every key
+
+        Returns:
+            bool: True if all keys were stored, False otherwise
+        """
+        try:
+            if not mapping:
+                return True
+
+            # Use pipeline so all keys (and their TTLs) land together
+            pipeline = self.redis_client.pipeline()
+            for key, raw in mapping.items():
+                pipeline.set(key, raw, ex=expire)
+
+            results = pipeline.execute()
+            return all(results)
+
+        except Exception as e:
+            logger.error(f"Error storing multiple keys in Redis: {e}")
+            return False
+
+    def set_if_absent(self, key: str, data: Any, expire: int = None) -> bool:
+        """
+        Store data only if the key does not exist yet (SET NX)
+
+        Args:
+            key: Redis key
+            data: Data to store (will be JSON serialized)
+            expire: Expiration time in seconds
+
+        Returns:
+            bool: True if the key was set, False if it already existed or on error
+        """
+        try:
+            return bool(self.redis_client.set(key, _dumps(data), ex=expire, nx=True))
+        except Exception as e:
+            logger.error(f"Error storing data in Redis key {key}: {e}")
+            return False
+
+    def increment(self, key: str, amount: int = 1) -> Optional[int]:
+        """
+        Atomically increment an integer counter
+
+        Args:
+            key: Redis key
+            amount: Increment
+
+        Returns:
+            New value or None on error
+        """
+        try:
+            return self.redis_client.incrby(key, amount)
+        except Exception as e:
+            logger.error(f"Error incrementing Redis key {key}: {e}")
+            return None
+
+    def delete_if_equal(self, key: str, value: str) -> bool:
+        """
+        Delete a key only if it still holds the given value (atomic compare-and-delete)
+
+        Args:
+            key: Redis key
+            value: Value the key must hold
+
+        Returns:
+            bool: True if the key was deleted, False if it held another value, was missing or on error
+        """
+        try:
+            return bool(self._delete_if_equal(keys=[key], args=[value]))
+        except Exception as e:
+            logger.error(f"Error deleting key {key} from Redis: {e}")
+            return False
+
+    def get_hash(self, key: str) -> Dict[str, str]:
+        """
+        Retrieve all fields of a hash
+
+        Args:
+            key: Redis key
+
+        Returns:
+            Dictionary of field -> value (empty if missing or on error)
+        """
+        try:
+            return self.redis_client.hgetall(key)
+        except Exception as e:
+            logger.error(f"Error retrieving hash {key} from Redis: {e}")
+            return {}
+
+    def set_hash(self, key: str, mapping: Dict[str, Any]) -> bool:
+        """
+        Set fields of a hash, keeping its other fields and its TTL
+
+        Args:
+            key: Redis key
+            mapping: Dictionary of field -> value (str, bytes or number)
+
+        Returns:
+            bool: True if successful, False otherwise
+        """
+        try:
+            self.redis_client.hset(key, mapping=mapping)
+            return True
+        except Exception as e:
+            logger.error(f"Error storing hash {key} in Redis: {e}")
+            return False
+
+    def replace_hash(self, key: str, mapping: Dict[str, Any], expire: int = None) -> bool:
+        """
+        Replace a hash with exactly the given fields in a single round trip
+
+        Args:
+            key: Redis key
+            mapping: Dictionary of field -> value (str, bytes or number)
+            expire: Expiration time in seconds
+
+        Returns:
+            bool: True if successful, False otherwise
+        """
+        try:
+            pipeline = self.redis_client.pipeline()
+            pipeline.delete(key)
+            pipeline.hset(key, mapping=mapping)
+            if expire:
+                pipeline.expire(key, expire)
+            pipeline.execute()
+            return True
+        except Exception as e:
+            logger.error(f"Error replacing hash {key} in Redis: {e}")
+            return False
+
+    def expire_multiple(self, keys: List[str], expire: int) -> bool:
+        """
+        Reset the TTL of multiple keys in a single round trip
+
+        Args:
+            keys: List of Redis keys
+            expire: Expiration time in seconds
+
+        Returns:
+            bool: True if every key existed and got the TTL, False otherwise
+        """
+        try:
+            pipeline = self.redis_client.pipeline(transaction=False)
+            for key in keys:
+                pipeline.expire(key, expire)
+            return all(pipeline.execute())
+        except Exception as e:
+            logger.error(f"Error setting TTL of multiple keys in Redis: {e}")
+            return False
+
     def delete_data(self, key: str) -> bool:
         """
         Delete data from Redis
@@ -142,6 +411,23 @@ class RedisService:
             logger.error(f"Error checking key existence {key}: {e}")
             return False
     
+    def publish(self, channel: str, message: str) -> int:
+        """
+        Publish a message on a Redis pub/sub channel
+
+        Args:
+            channel: Channel name
+            message: Message payload
+
+        Returns:
+            int: Number of subscribers that received the message (0 on error)
+        """
+        try:
+            return self.redis_client.publish(channel, message)
+        except Exception as e:
+            logger.error(f"Error publishing to Redis channel {channel}: {e}")
+            return 0
+
     def get_keys_by_pattern(self, pattern: str) -> List[str]:
         """
         Get keys matching a pattern
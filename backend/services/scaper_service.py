@@ -1,12 +1,20 @@
-import requests
-import redis
 import os
-from backend.services.crypt_service import decrypt_data, encrypt_data
-from backend.services.gtoken_get_service import get_cookie_token
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from concurrent.futures import TimeoutError as FutureTimeoutError
 
+from django.conf import settings
 
-redis_client = redis.Redis(host="redis", port=6379, db=0)
-REDIS_KEY_G_TOKEN = "G_TOKEN"
+from backend.services import metrics
+from backend.services.crypt_service import get_codec
+from backend.services.http_session import get_upstream_session, report_connection_stats
+from backend.services.token_manager import get_token, refresh_token
+from backend.services.upstream_guard import CircuitOpenError, alternate_url, get_endpoint_guard
+
+_hedge_lock = threading.Lock()
+_hedge_executor = None
+_hedge_pid = None
 
 
 def get_tree_record(password: str):
@@ -19,82 +27,186 @@ def get_tree_record(password: str):
     if not encrypted_data:
         raise Exception("No 'data' field in response")
 
-    return decrypt_data(encrypted_data, password)
+    return get_codec(password).decrypt(encrypted_data)
 
 
 
-def get_odds(sport_id: int, event_id: int, password: str):
+def get_odds(sport_id: int, event_id: int, password: str, session=None):
     """
     Python equivalent of getOddsFn
+
+    Uses the shared keep-alive session unless a requests.Session is passed.
+    """
+    return get_codec(password).decrypt(get_odds_ciphertext(sport_id, event_id, password, session=session))
+
+
+def get_odds_ciphertext(sport_id: int, event_id: int, password: str, session=None) -> str:
+    """
+    The still-encrypted gamedataPrivate response of one event, so decryption
+    can run in another process than the network call.
     """
     url = f"https://d247.com/api/front/gamedataPrivate?etId={sport_id}&gmid={event_id}"
 
     payload = {
-        "data": encrypt_data({
+        "data": get_codec(password).encrypt({
             "etid": sport_id,
             "gmid": event_id,
-        },password=password)
+        })
     }
 
-    res_json = fetch_api(url, method="POST", payload=payload)
+    res_json = fetch_api(url, method="POST", payload=payload, session=session)
     encrypted_data = res_json.get("data")
 
     if not encrypted_data:
         raise Exception("No 'data' field in response")
 
-    return decrypt_data(encrypted_data, password)
+    return encrypted_data
 
-def get_highlight_home_private(etid: int, password: str):
+def get_highlight_home_private(etid: int, password: str, session=None):
     """
     Python equivalent of getHighlightHomePrivateFn
+
+    Returns the headline (match odds) markets of every event of a sport.
     """
     url = f"{os.getenv('BASE_URL')}/front/highlighthomePrivate?etid={etid}"
 
     payload = {
-        "data": encrypt_data({
+        "data": get_codec(password).encrypt({
             "etid": etid,
             "type": "all",
-        }, password)  # <-- pass password
+        })
     }
 
-    res_json = fetch_api(url, method="POST", payload=payload, timeout=3)
+    res_json = fetch_api(url, method="POST", payload=payload, timeout=3, session=session)
     encrypted_data = res_json.get("data")
 
     if not encrypted_data:
         raise Exception("No 'data' field in response")
 
-    return decrypt_data(encrypted_data, password)
+    return get_codec(password).decrypt(encrypted_data)
 # ----------------------------------------------
 #                 HELPER FUNCTIONS
 # ----------------------------------------------
 
-def fetch_api(url, method="GET", payload=None, headers=None, timeout=3):
+def fetch_api(url, method="GET", payload=None, headers=None, timeout=3, session=None):
     # 1. Try existing cookie from Redis
-    cookie_value = redis_client.get(REDIS_KEY_G_TOKEN)
-    if cookie_value:
-        cookie_value = cookie_value.decode("utf-8")
-        resp = make_request(cookie_value, headers, url, method, payload, timeout)
-        if resp.status_code == 401:  # expired → refresh
-            cookie_value = get_cookie_token()   # 🔥 call Selenium/Playwright here
-            redis_client.setex(REDIS_KEY_G_TOKEN, 3600, cookie_value)
-            resp = make_request(cookie_value, headers, url, method, payload, timeout)
-    else:
-        # 2. No cookie → use Selenium/Playwright
-        cookie_value = get_cookie_token()
-        redis_client.setex(REDIS_KEY_G_TOKEN, 3600, cookie_value)
-        resp = make_request(cookie_value, headers, url, method, payload, timeout)
+    cookie_value = get_token()
+    if not cookie_value:
+        # 2. No cookie → one process refreshes it, the others wait for it
+        cookie_value = refresh_token()
+
+    resp = make_request(cookie_value, headers, url, method, payload, timeout, session)
+    if resp.status_code == 401:  # expired → refresh (single-flight)
+        cookie_value = refresh_token(stale=cookie_value)
+        resp = make_request(cookie_value, headers, url, method, payload, timeout, session)
 
     resp.raise_for_status()
     return resp.json()
 
 
-def make_request(cookie_value,headers=None, url=None, method="GET", payload=None, timeout=3):
+def make_request(cookie_value,headers=None, url=None, method="GET", payload=None, timeout=3, session=None):
+    """
+    Send one upstream call through its endpoint's circuit breaker, adaptive
+    concurrency limit and (when enabled) hedging.
+
+    Raises CircuitOpenError without calling upstream while the endpoint's
+    circuit is open, and ConcurrencyLimitError when no slot frees up within
+    `timeout`.
+    """
     final_headers = {
         **(headers or {}),
         "Cookie": f"{cookie_value}",
         "Content-Type": "application/json",
         "Accept": "application/json",
     }
-    if method.upper() == "POST":
-        return requests.post(url, headers=final_headers, json=payload, timeout=timeout)
-    return requests.get(url, headers=final_headers, timeout=timeout)
+    guard = get_endpoint_guard(url)
+    limited = settings.UPSTREAM_AIMD_ENABLED
+    if limited:
+        # before the breaker check, so a half-open probe never waits for a slot
+        guard.limiter.acquire(timeout)
+    if not guard.breaker.allow():
+        if limited:
+            guard.limiter.cancel()
+        raise CircuitOpenError(f"Circuit open for upstream {guard.name}")
+
+    metrics.incr(f"upstream.{guard.name}.requests")
+    started = time.monotonic()
+    ok, elapsed = False, None
+    try:
+        if settings.UPSTREAM_HEDGE_ENABLED:
+            resp = _hedged_send(guard, final_headers, url, method, payload, timeout, session)
+        else:
+            resp = _send(final_headers, url, method, payload, timeout, session)
+    except Exception:
+        # any error, so a failed half-open probe always reopens the circuit
+        guard.breaker.record_failure()
+        raise
+    else:
+        elapsed = time.monotonic() - started
+        ok = resp.status_code != 429 and resp.status_code < 500
+    finally:
+        if limited:
+            guard.limiter.release(ok, latency=elapsed, baseline=guard.latency.percentile(50))
+
+    if ok:
+        guard.breaker.record_success()
+        guard.latency.record(elapsed)
+    else:
+        guard.breaker.record_failure()
+    metrics.observe(f"upstream.{guard.name}.seconds", elapsed)
+    return resp
+
+
+def _send(final_headers, url, method, payload, timeout, session):
+    client = session or get_upstream_session()
+    try:
+        if method.upper() == "POST":
+            return client.post(url, headers=final_headers, json=payload, timeout=timeout)
+        return client.get(url, headers=final_headers, timeout=timeout)
+    finally:
+        report_connection_stats()
+
+
+def _get_hedge_executor() -> ThreadPoolExecutor:
+    global _hedge_executor, _hedge_pid
+    with _hedge_lock:
+        # worker threads do not survive a fork
+        if _hedge_executor is None or _hedge_pid != os.getpid():
+            _hedge_executor = ThreadPoolExecutor(
+                max_workers=settings.UPSTREAM_HEDGE_WORKERS, thread_name_prefix="upstream-hedge"
+            )
+            _hedge_pid = os.getpid()
+        return _hedge_executor
+
+
+def _hedged_send(guard, final_headers, url, method, payload, timeout, session):
+    # the first attempt gets the endpoint's tail latency to answer; after that a
+    # second attempt goes to the alternate base URL and the first good answer wins
+    executor = _get_hedge_executor()
+    primary = executor.submit(_send, final_headers, url, method, payload, timeout, session)
+    try:
+        return primary.result(timeout=guard.hedge_delay())
+    except FutureTimeoutError:
+        pass
+
+    metrics.incr(f"upstream.{guard.name}.hedged")
+    hedge = executor.submit(_send, final_headers, alternate_url(url), method, payload, timeout, session)
+
+    pending, error, rejected = {primary, hedge}, None, None
+    while pending:
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            if future.exception() is not None:
+                error = future.exception()
+                continue
+            resp = future.result()
+            if resp.status_code == 429 or resp.status_code >= 500:
+                # a 429/5xx is not an answer while the other attempt may still succeed
+                rejected = resp
+                continue
+            if future is hedge:
+                metrics.incr(f"upstream.{guard.name}.hedge_wins")
+            return resp
+    if rejected is not None:
+        return rejected
+    raise error
@@ -0,0 +1,81 @@
+import logging
+import threading
+import time
+from typing import Dict, Optional
+
+from django.conf import settings
+
+from backend.services.redis_service import redis_service
+
+logger = logging.getLogger(__name__)
+
+# event_type_id -> sport name, written by save_tree_data
+SPORT_NAMES_KEY = "sports:names"
+
+UNKNOWN_SPORT = "Unknown Sport"
+
+_lock = threading.Lock()
+_names: Dict[int, str] = {}
+_loaded_at = 0.0
+
+
+def get_sport_name(sport_id: int) -> str:
+    """
+    Sport name of an event_type_id, from a process-local copy of SPORT_NAMES_KEY.
+
+    The copy is reloaded from Redis every SPORT_NAMES_CACHE_TTL seconds, so
+    odds conversion never queries the database (only a cold Redis does, once).
+    """
+    if time.monotonic() - _loaded_at >= settings.SPORT_NAMES_CACHE_TTL:
+        _reload()
+    return _names.get(int(sport_id), UNKNOWN_SPORT)
+
+
+def warm_sport_names() -> Dict[int, str]:
+    """
+    Rebuild SPORT_NAMES_KEY from the Sport table. Called after save_tree_data.
+    """
+    from sports.models import Sport
+
+    names: Dict[int, str] = {}
+    # same pick as Sport.objects.filter(event_type_id=...).first() for sports in both trees
+    for event_type_id, name in Sport.objects.order_by("pk").values_list("event_type_id", "name"):
+        if event_type_id is not None:
+            names.setdefault(event_type_id, name)
+
+    if names:
+        redis_service.replace_hash(SPORT_NAMES_KEY, names)
+    invalidate_sport_names()
+    return names
+
+
+def invalidate_sport_names() -> None:
+    """
+    Make this process reload the names on its next lookup.
+    """
+    global _loaded_at
+    _loaded_at = 0.0
+
+
+def _reload() -> None:
+    global _names, _loaded_at
+    with _lock:
+        if time.monotonic() - _loaded_at < settings.SPORT_NAMES_CACHE_TTL:
+            return  # another thread just reloaded
+
+        names = _load_from_redis()
+        if names is None:
+            try:
+                names = warm_sport_names()
+            except Exception as e:
+                logger.error(f"Error loading sport names: {e}")
+                names = _names  # keep serving the last known names
+        _names = names
+        _loaded_at = time.monotonic()
+
+
+def _load_from_redis() -> Optional[Dict[int, str]]:
+    names = redis_service.get_hash(SPORT_NAMES_KEY)
+    if not names:
+        return None
+    return {int(event_type_id): name for event_type_id, name in names.items()}
@@ -0,0 +1,527 @@
+import gzip
+import hashlib
+import logging
+import time
+from typing import Any, Dict, List, Optional, Union
+
+import orjson
+from django.conf import settings
+
+from backend.services import metrics
+from backend.services.local_cache import LocalCache
+from backend.services.odds_model import OddsEvent, OddsMarket, encode_odds
+from backend.services.redis_service import redis_service
+
+logger = logging.getLogger(__name__)
+
+# Odds blobs are refreshed every second, anything older than this is dropped
+ODDS_TTL = 30
+
+# Writers publish the keys they changed here so API processes drop their cached copies
+ODDS_INVALIDATION_CHANNEL = "odds:invalidate"
+
+# Per-event channel carrying the markets that changed on each write (see odds_stream_service)
+ODDS_UPDATES_CHANNEL_PREFIX = "odds:updates:"
+
+# First bytes of every gzip stream; stored JSON documents never start with them
+GZIP_MAGIC = b"\x1f\x8b"
+
+odds_cache = LocalCache(
+    "odds_cache",
+    ttl=settings.ODDS_LOCAL_CACHE_TTL,
+    max_entries=settings.ODDS_LOCAL_CACHE_MAX_ENTRIES,
+    max_bytes=settings.ODDS_LOCAL_CACHE_MAX_BYTES,
+    track_stats=settings.ODDS_LOCAL_CACHE_STATS,
+)
+
+
+def get_odds_key(sport_id: int, event_id: int) -> str:
+    """
+    Redis key holding the converted odds document of an event.
+    """
+    return f"odds:{sport_id}:{event_id}"
+
+
+def get_odds_index_key(event_id) -> str:
+    """
+    Redis key mapping an event_id to its odds key and ETag, so readers never need
+    the sport_id and conditional requests never need the document itself.
+    """
+    return f"odds:event:{event_id}"
+
+
+def get_odds_fingerprint_key(event_id) -> str:
+    """
+    Redis hash of an event's odds fingerprints (whole document, header, each
+    market) plus when its odds were last fetched and last changed.
+    """
+    return f"odds:fp:{event_id}"
+
+
+def get_odds_projection_key(event_id) -> str:
+    """
+    Redis hash of an event's odds split for partial reads: "header" (the
+    document without markets), "groups" (the market index, see
+    build_market_index), "etag" (document it was built from) and one
+    "m:{marketId}" field per market holding its JSON.
+    """
+    return f"odds:proj:{event_id}"
+
+
+def get_odds_updates_channel(event_id) -> str:
+    """
+    Pub/sub channel on which odds deltas of an event are published.
+    """
+    return f"{ODDS_UPDATES_CHANNEL_PREFIX}{event_id}"
+
+
+def compute_etag(body: bytes) -> str:
+    """
+    Content hash of a serialized odds document, used as its HTTP ETag.
+    """
+    return hashlib.blake2b(body, digest_size=8).hexdigest()
+
+
+def compress_odds(body: bytes) -> bytes:
+    """
+    The bytes to store for a serialized odds document: gzipped when
+    compression is enabled and the document is at least
+    ODDS_COMPRESSION_MIN_BYTES, else the JSON itself.
+    """
+    if not settings.ODDS_COMPRESSION_ENABLED or len(body) < settings.ODDS_COMPRESSION_MIN_BYTES:
+        return body
+
+    # mtime=0: the same document always compresses to the same bytes
+    stored = gzip.compress(body, compresslevel=settings.ODDS_COMPRESSION_LEVEL, mtime=0)
+    metrics.observe("odds_store.json_bytes", len(body))
+    metrics.observe("odds_store.stored_bytes", len(stored))
+    metrics.observe("odds_store.compression_ratio", round(len(body) / len(stored), 2))
+    metrics.incr("odds_store.bytes_saved", len(body) - len(stored))
+    return stored
+
+
+def is_gzipped(stored: Optional[bytes]) -> bool:
+    return bool(stored) and stored[:2] == GZIP_MAGIC
+
+
+def decode_stored_odds(stored: Optional[bytes]) -> Optional[bytes]:
+    """
+    The JSON of a stored odds document, decompressing it when it was stored gzipped.
+    """
+    if not stored:
+        return None
+    return gzip.decompress(stored) if is_gzipped(stored) else stored
+
+
+def format_event_response(event_data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Shape a converted odds document exactly like the odds API responds with it,
+    so the stored JSON can be served as-is.
+    """
+    return {
+        "eventid": str(event_data.get('eventid', event_data.get('eventId', ''))),
+        "eventName": event_data.get('eventName', ''),
+        "updateTime": event_data.get('updateTime'),
+        "status": event_data.get('status', 'OPEN'),
+        "inplay": event_data.get('inplay', False),
+        "sport": event_data.get('sport', {}),
+        "sportId": event_data.get('sportId'),
+        "eventId": str(event_data.get('eventid', event_data.get('eventId', ''))),
+        "isLiveStream": event_data.get('isLiveStream'),
+        "markets": event_data.get('markets', {})
+    }
+
+
+def store_event_odds(sport_id: int, event_id: int, odds_data: Union[OddsEvent, Dict[str, Any]],
+                     expire: int = ODDS_TTL) -> bool:
+    """
+    Store converted odds for an event together with its event_id index entry.
+
+    The document is stored response-shaped, and both keys are written in one
+    pipeline with the same TTL, so the index never outlives (or points at) a
+    missing odds document for long. The index entry carries the ETag of the
+    document and when it last changed.
+
+    The document is fingerprinted as a whole and per market. When the event
+    fingerprint matches the stored one nothing is rewritten or published:
+    only the TTLs and the fetch time are refreshed. Returns True when the
+    odds changed (and were stored).
+
+    An OddsEvent is stored without re-encoding its markets: their cached
+    JSON is embedded as is. Large documents are stored gzipped (see
+    compress_odds); the ETag is always the one of the JSON.
+    """
+    key = get_odds_key(sport_id, event_id)
+    index_key = get_odds_index_key(event_id)
+    fingerprint_key = get_odds_fingerprint_key(event_id)
+    projection_key = get_odds_projection_key(event_id)
+    if isinstance(odds_data, OddsEvent):
+        odds_data = {**odds_data.header(), "markets": odds_data.market_groups()}
+    document = format_event_response(odds_data)
+    body = orjson.dumps(document, default=encode_odds, option=orjson.OPT_NON_STR_KEYS)
+    etag = compute_etag(body)
+    now = time.time()
+
+    # without projection its key never exists, and EXPIRE on it would count as a miss
+    live_keys = [key, index_key, fingerprint_key]
+    if settings.ODDS_PROJECTION_ENABLED:
+        live_keys.append(projection_key)
+
+    previous, projected_etag = _get_previous_fingerprints(fingerprint_key, projection_key)
+    if previous.get("event") == etag:
+        if settings.ODDS_PROJECTION_ENABLED and projected_etag != etag:
+            # an earlier projection write failed: the document is current, its projection is not
+            store_odds_projection(projection_key, document, fingerprint_document(document), etag, expire=expire)
+        if redis_service.expire_multiple(live_keys, expire):
+            redis_service.set_hash(fingerprint_key, {"fetchedAt": now})
+            metrics.incr("odds_store.unchanged")
+            return False
+
+    fingerprints = fingerprint_document(document)
+    stored = redis_service.set_multiple_raw({
+        key: compress_odds(body),
+        index_key: orjson.dumps({"key": key, "etag": etag, "changedAt": now}),
+    }, expire=expire)
+    if not stored:
+        return False
+
+    redis_service.replace_hash(fingerprint_key, {
+        **fingerprints,
+        "event": etag,
+        "changedAt": now,
+        "fetchedAt": now,
+    }, expire=expire)
+    # only rewrite the markets that changed, unless the projection is not of the previous document
+    store_odds_projection(
+        projection_key, document, fingerprints, etag,
+        previous=previous if projected_etag and projected_etag == previous.get("event") else None,
+        expire=expire,
+    )
+    redis_service.publish(ODDS_INVALIDATION_CHANNEL, f"{key} {index_key}")
+    metrics.incr("odds_store.changed")
+
+    delta = build_odds_delta(previous, document, fingerprints)
+    if delta:
+        redis_service.publish(get_odds_updates_channel(document["eventid"]), orjson.dumps(delta, default=encode_odds))
+    return True
+
+
+def _get_previous_fingerprints(fingerprint_key: str, projection_key: str):
+    try:
+        pipeline = redis_service.redis_client.pipeline(transaction=False)
+        pipeline.hgetall(fingerprint_key)
+        pipeline.hget(projection_key, "etag")
+        previous, projected_etag = pipeline.execute()
+        return previous or {}, projected_etag
+    except Exception as e:
+        logger.error(f"Error reading odds fingerprints {fingerprint_key} from Redis: {e}")
+        return {}, None
+
+
+def build_market_index(document: Dict[str, Any]) -> List[List[Any]]:
+    """
+    The "groups" field of an odds projection: one [group key, market ids,
+    lowercased market names] entry per group, in document order.
+    """
+    index = []
+    for group, markets_list in (document.get("markets") or {}).items():
+        market_ids, names = [], []
+        for market in markets_list:
+            if isinstance(market, OddsMarket):
+                market_ids.append(market.market_id)
+                names.append((market.name or "").lower())
+            else:
+                market_ids.append(market.get("marketId"))
+                names.append((market.get("market") or "").lower())
+        index.append([group, market_ids, names])
+    return index
+
+
+def store_odds_projection(projection_key: str, document: Dict[str, Any], fingerprints: Dict[str, str],
+                          etag: str, previous: Optional[Dict[str, str]] = None, expire: int = ODDS_TTL) -> bool:
+    """
+    Write the projection hash of an odds document (see get_odds_projection_key).
+
+    With the fingerprints of the document the projection currently holds
+    (`previous`), only changed markets are written and removed ones deleted;
+    otherwise the hash is rebuilt.
+    """
+    if not settings.ODDS_PROJECTION_ENABLED:
+        return False
+
+    header = {field: value for field, value in document.items() if field != "markets"}
+    mapping = {
+        "header": orjson.dumps(header, option=orjson.OPT_NON_STR_KEYS),
+        "groups": orjson.dumps(build_market_index(document)),
+        "etag": etag,
+    }
+    for markets_list in (document.get("markets") or {}).values():
+        for market in markets_list:
+            market_id = market.market_id if isinstance(market, OddsMarket) else market.get('marketId')
+            field = f"m:{market_id}"
+            if previous is not None and previous.get(field) == fingerprints[field]:
+                continue
+            if isinstance(market, OddsMarket):
+                mapping[field] = market.json()
+            else:
+                mapping[field] = orjson.dumps(market, option=orjson.OPT_NON_STR_KEYS)
+
+    try:
+        pipeline = redis_service.redis_client.pipeline()
+        if previous is None:
+            pipeline.delete(projection_key)
+        else:
+            removed = [field for field in previous if field.startswith("m:") and field not in fingerprints]
+            if removed:
+                pipeline.hdel(projection_key, *removed)
+        pipeline.hset(projection_key, mapping=mapping)
+        pipeline.expire(projection_key, expire)
+        pipeline.execute()
+        return True
+    except Exception as e:
+        logger.error(f"Error storing odds projection {projection_key} in Redis: {e}")
+        return False
+
+
+def get_projected_odds_raw(event_id, market_ids: Optional[List] = None,
+                           market_types: Optional[List[str]] = None) -> Optional[bytes]:
+    """
+    JSON of an event's odds restricted to the requested markets (same
+    matching as filter_markets), read with HMGET from its projection hash:
+    only the header, the market index and the wanted markets leave Redis.
+
+    Returns None when the event has no projection, or when the projection
+    is not of the current document (its "etag" differs from the index entry).
+    """
+    projection_key = get_odds_projection_key(event_id)
+    header, groups, projected_etag = redis_service.redis_client.hmget(projection_key, ["header", "groups", "etag"])
+    if not header or not groups:
+        return None
+    index = get_event_odds_index(event_id)
+    if not index or index.get("etag") != projected_etag:
+        metrics.incr("odds_projection.stale")
+        return None
+
+    wanted_ids = {str(market_id) for market_id in market_ids} if isinstance(market_ids, list) and market_ids else None
+    wanted_types = {str(market_type).lower() for market_type in market_types} if market_types else None
+
+    selected = []
+    for group, group_market_ids, names in orjson.loads(groups):
+        if wanted_ids is not None:
+            kept = [position for position, market_id in enumerate(group_market_ids) if market_id in wanted_ids]
+            group_market_ids = [group_market_ids[position] for position in kept]
+            names = [names[position] for position in kept]
+        if not group_market_ids:
+            continue
+        if wanted_types is not None and group.lower() not in wanted_types and wanted_types.isdisjoint(names):
+            continue
+        selected.append((group, group_market_ids))
+
+    fields = [f"m:{market_id}" for _, group_market_ids in selected for market_id in group_market_ids]
+    bodies = iter(redis_service.redis_client.hmget(projection_key, fields) if fields else [])
+
+    markets = {}
+    for group, group_market_ids in selected:
+        group_markets = [orjson.Fragment(body) for body in (next(bodies) for _ in group_market_ids) if body]
+        if group_markets:
+            markets[group] = group_markets
+
+    return orjson.dumps({**orjson.loads(header), "markets": markets})
+
+
+def fingerprint_document(document: Dict[str, Any]) -> Dict[str, str]:
+    """
+    Fingerprints of an odds document's header ("header") and of each market ("m:{marketId}").
+
+    Markets may be dicts or OddsMarket objects (hashed from their cached JSON).
+    """
+    header = {field: value for field, value in document.items() if field != "markets"}
+    fingerprints = {"header": compute_etag(orjson.dumps(header, option=orjson.OPT_NON_STR_KEYS))}
+    for markets_list in (document.get("markets") or {}).values():
+        for market in markets_list:
+            if isinstance(market, OddsMarket):
+                fingerprints[f"m:{market.market_id}"] = compute_etag(market.json())
+            else:
+                fingerprints[f"m:{market.get('marketId')}"] = compute_etag(
+                    orjson.dumps(market, option=orjson.OPT_NON_STR_KEYS)
+                )
+    return fingerprints
+
+
+def build_odds_delta(previous: Dict[str, str], current: Dict[str, Any],
+                     fingerprints: Dict[str, str]) -> Optional[Dict[str, Any]]:
+    """
+    Describe what changed in an odds document, given the fingerprints stored
+    for its previous version and those of the current one.
+
+    Returns the event header plus only the markets whose fingerprint changed
+    (grouped like the document) and the ids of markets that disappeared,
+    or None when nothing changed.
+    """
+    changed = {}
+    for group, markets_list in (current.get("markets") or {}).items():
+        for market in markets_list:
+            market_id = market.market_id if isinstance(market, OddsMarket) else market.get('marketId')
+            field = f"m:{market_id}"
+            if previous.get(field) != fingerprints[field]:
+                changed.setdefault(group, []).append(market)
+
+    removed = [
+        field[2:] for field in previous
+        if field.startswith("m:") and field not in fingerprints
+    ]
+
+    if not changed and not removed and previous.get("header") == fingerprints["header"]:
+        return None
+
+    header = {field: value for field, value in current.items() if field != "markets"}
+    return {
+        "type": "delta",
+        **header,
+        "markets": changed,
+        "removed": removed,
+    }
+
+
+def filter_markets(odds_data: Dict, market_ids: Optional[List] = None,
+                   market_types: Optional[List[str]] = None) -> Dict:
+    """
+    Keep only the requested markets of an odds document (or delta), in place.
+
+    market_ids match marketId; market_types match the group key or the market
+    name, case-insensitively.
+    """
+    # filter by market_ids
+    if isinstance(market_ids, list) and market_ids:
+        wanted_ids = {str(market_id) for market_id in market_ids}
+        filtered_markets = {}
+        for key, markets_list in odds_data.get("markets", {}).items():
+            filtered = [m for m in markets_list if m.get("marketId") in wanted_ids]
+            if filtered:
+                filtered_markets[key] = filtered
+        odds_data["markets"] = filtered_markets
+
+    # filter by market_type (group key or market name, case-insensitive)
+    if market_types:
+        wanted_types = {str(market_type).lower() for market_type in market_types}
+        filtered_by_type = {
+            key: markets_list
+            for key, markets_list in odds_data.get("markets", {}).items()
+            if key.lower() in wanted_types
+            or any(m.get("market") and m["market"].lower() in wanted_types for m in markets_list)
+        }
+        odds_data["markets"] = filtered_by_type
+
+    return odds_data
+
+
+def _get_raw(key: str, binary: bool = False) -> Optional[Union[str, bytes]]:
+    """
+    Read the stored value of a key through the per-process cache. `binary`
+    reads it as bytes (odds documents, which may be gzipped).
+    """
+    read = redis_service.get_bytes if binary else redis_service.get_raw
+    if not settings.ODDS_LOCAL_CACHE_ENABLED:
+        return read(key)
+
+    odds_cache.listen_for_invalidations(ODDS_INVALIDATION_CHANNEL)
+    raw = odds_cache.get(key)
+    if raw is None:
+        raw = read(key)
+        if raw:
+            odds_cache.set(key, raw)
+    return raw
+
+
+def _get_many_raw(keys: List[str], binary: bool = False) -> Dict[str, Optional[Union[str, bytes]]]:
+    """
+    Read the stored values of many keys through the per-process cache, fetching misses with one MGET.
+    """
+    read_many = redis_service.get_multiple_bytes if binary else redis_service.get_multiple_raw
+    if not settings.ODDS_LOCAL_CACHE_ENABLED:
+        return read_many(keys)
+
+    odds_cache.listen_for_invalidations(ODDS_INVALIDATION_CHANNEL)
+    found = {key: odds_cache.get(key) for key in keys}
+    missing = [key for key, raw in found.items() if raw is None]
+    for key, raw in read_many(missing).items():
+        found[key] = raw
+        if raw:
+            odds_cache.set(key, raw)
+    return found
+
+
+def _loads(raw: Optional[str]) -> Optional[Any]:
+    return orjson.loads(raw) if raw else None
+
+
+def get_event_odds_index(event_id) -> Optional[Dict[str, str]]:
+    """
+    Read the index entry of an event:
+    {"key": odds key, "etag": document ETag, "changedAt": unix time the odds last changed}.
+    """
+    return _loads(_get_raw(get_odds_index_key(event_id)))
+
+
+def get_multiple_event_odds_index(event_ids: List) -> Dict[str, Optional[Dict[str, str]]]:
+    """
+    Read the index entries of many events with one MGET (see get_event_odds_index).
+    """
+    index_keys = {str(event_id): get_odds_index_key(event_id) for event_id in event_ids}
+    entries = _get_many_raw(list(index_keys.values()))
+    return {event_id: _loads(entries.get(index_key)) for event_id, index_key in index_keys.items()}
+
+
+def get_odds_stored(index: Optional[Dict[str, str]]) -> Optional[bytes]:
+    """
+    Read the stored bytes an index entry points at: the JSON, or its gzip
+    stream for large documents (see is_gzipped / decode_stored_odds).
+    """
+    if not index or not index.get("key"):
+        return None
+    return _get_raw(index["key"], binary=True)
+
+
+def get_odds_raw(index: Optional[Dict[str, str]]) -> Optional[bytes]:
+    """
+    Read the JSON an index entry points at.
+    """
+    return decode_stored_odds(get_odds_stored(index))
+
+
+def get_event_odds(event_id) -> Optional[Dict[str, Any]]:
+    """
+    Look up the odds document of an event by event_id only (two O(1) GETs, no KEYS scan).
+    """
+    return _loads(get_event_odds_raw(event_id))
+
+
+def get_event_odds_raw(event_id) -> Optional[bytes]:
+    """
+    Same as get_event_odds, but returns the JSON without decoding it.
+    """
+    return get_odds_raw(get_event_odds_index(event_id))
+
+
+def get_multiple_event_odds(event_ids: List, indexes: Optional[Dict[str, Optional[Dict]]] = None) -> Dict[str, Optional[Dict[str, Any]]]:
+    """
+    Look up the odds documents of many events with two pipelined round trips
+    (index entries first, then the odds documents they point at).
+
+    Returns a map of event_id -> odds document (None when the event has no live odds).
+    """
+    raw_by_event = get_multiple_event_odds_raw(event_ids, indexes=indexes)
+    return {event_id: _loads(raw) for event_id, raw in raw_by_event.items()}
+
+
+def get_multiple_event_odds_raw(event_ids: List, indexes: Optional[Dict[str, Optional[Dict]]] = None) -> Dict[str, Optional[bytes]]:
+    """
+    Same as get_multiple_event_odds, but returns the JSON without decoding it.
+
+    Pass `indexes` (from get_multiple_event_odds_index) to skip the index lookup.
+    """
+    if indexes is None:
+        indexes = get_multiple_event_odds_index(event_ids)
+    wanted = {event_id: (index or {}).get("key") for event_id, index in indexes.items()}
+    documents = _get_many_raw([key for key in wanted.values() if key], binary=True)
+    return {event_id: decode_stored_odds(documents.get(key)) if key else None for event_id, key in wanted.items()}
@@ -1,5 +1,6 @@
 from sports.models import Sport, Competition, Event
 from django.db import transaction
+from backend.services.sport_name_service import warm_sport_names
 from datetime import datetime
 
 
@@ -10,6 +11,7 @@ def save_tree_data(tree_data: dict):
     - Insert new data if not present.
     - If competitions/events are missing in new payload but exist in DB → delete them.
     - Never delete Sport records.
+    - Refresh the cached sport names once committed.
     """
     with transaction.atomic():
         sports_data = tree_data.get("data") or {}
@@ -95,3 +97,5 @@ def save_tree_data(tree_data: dict):
 
             # Delete missing events under this sport (T2 has no competitions)
             Event.objects.filter(sport=sport, competition__isnull=True).exclude(event_id__in=seen_event_ids).delete()
+
+        transaction.on_commit(warm_sport_names)
@@ -1,13 +1,22 @@
 from celery import shared_task
 from backend.services.store_market_ids import store_market_ids
-from backend.services.covert_odds_data import convert_odds_format
 from backend.services.scaper_service import get_odds, get_tree_record
 from backend.services.store_treedata_service import save_tree_data
-from backend.services.redis_service import redis_service
+from backend.services.store_odds_service import get_odds_key
+from backend.services.token_manager import get_token_age, renew_token_if_expiring
+from backend.services.odds_ingest_service import refresh_event_odds, refresh_sport_highlights
+from backend.services.odds_backpressure import DISPATCHED_AT_HEADER, get_shedding_level, min_priority_for, shed_events
+from backend.services.odds_lease_service import acquire_fetch_leases, release_fetch_lease
+from backend.services.odds_scheduler import claim_due_events, sync_schedule
+from backend.services.odds_watch_service import select_full_refresh_events
 from django.core.exceptions import ObjectDoesNotExist
 import os
+import time
 
-from sports.models import Event
+from sports.models import Event, Sport
+
+# Lease "event" id used for the sport-level highlight fetch (see acquire_fetch_leases)
+HIGHLIGHT_LEASE_EVENT = "highlight"
 
 @shared_task
 def save_tree_data_task():
@@ -19,61 +28,146 @@ def save_tree_data_task():
     return "Tree data saved successfully"
 
 @shared_task
-def fetch_and_store_odds(sport_id: int, event_id: int):
+def fetch_and_store_odds(sport_id: int, event_id: int, lease: str = None):
     """
     Task to fetch odds, convert format, and store in Redis
+
+    `lease` is the event's fetch lease taken at dispatch; it is released when
+    the task ends so the next dispatch of the event can go through.
     """
     try:
-        # Fetch raw odds data
-        raw_odds = get_odds(sport_id, event_id, os.getenv("DECRYPTION_KEY"))
+        # Fetch, convert (with sport_id and event_id) and store the odds
+        changed = refresh_event_odds(sport_id, event_id)
         
-        if not raw_odds:
-            print(f"[WARNING] No odds data received for sport_id: {sport_id}, event_id: {event_id}")
+        if changed is None:
+            print(f"[WARNING] No odds data received/converted for sport_id: {sport_id}, event_id: {event_id}")
             return
         
-        # Convert odds to target format with sport_id and event_id
-        converted_odds = convert_odds_format(raw_odds, sport_id=sport_id, event_id=event_id)
-        
-        if not converted_odds:
-            print(f"[WARNING] No odds converted for sport_id: {sport_id}, event_id: {event_id}")
+        key = get_odds_key(sport_id, event_id)
+        if not changed:
+            print(f"[INFO] Odds unchanged for sport_id: {sport_id}, event_id: {event_id}, TTL refreshed: {key}")
             return
-        
-        # Store converted odds in Redis as JSON
-        key = f"odds:{sport_id}:{event_id}"
-        
-        # Store the single event object (since convert_odds_format now returns a single object)
-        redis_service.set_data(key, converted_odds, expire=30)
-        
+
         print(f"[SUCCESS] Converted and stored odds for sport_id: {sport_id}, event_id: {event_id} in Redis: {key}")
         
     except Exception as e:
         print(f"[ERROR] Failed to fetch/convert/store odds for sport_id: {sport_id}, event_id: {event_id} - {e}")
+    finally:
+        release_fetch_lease(sport_id, event_id, lease)
 
 
 @shared_task
 def fetch_odds_for_all_events():
     """
     Fetch odds for all events dynamically from the database.
+
+    With the adaptive schedule enabled, only the events whose refresh is due are
+    queued. An event that still has a fetch queued or running is skipped, so
+    there is never more than one odds task per event in the queue. When the
+    workers lag behind, low-priority (pre-match) events are shed first so
+    in-play odds keep refreshing.
     """
+    from django.conf import settings
+    if settings.ODDS_INGESTION_MODE == "engine":
+        # odds are refreshed by the run_odds_engine process instead
+        return
+
     try:
-        events = Event.objects.select_related("sport").all()
-        
-        total_events = events.count()
-        print(f"[INFO] Starting odds fetch for {total_events} events")
-        
-        for event in events:
-            sport_id = event.sport.event_type_id  # your mapping
-            event_id = event.event_id
-            
+        level = get_shedding_level()
+        if settings.ODDS_SCHEDULE_ENABLED:
+            sync_schedule()
+            events = claim_due_events(min_priority=min_priority_for(level))
+        else:
+            events = shed_events(
+                Event.objects.values_list("sport__event_type_id", "event_id", "event_open_date"), level
+            )
+            print(f"[INFO] Starting odds fetch for {len(events)} events")
+
+        if settings.ODDS_BULK_INGESTION_ENABLED:
+            # the others are refreshed by fetch_highlights_for_all_sports
+            events = select_full_refresh_events(events)
+
+        leases = acquire_fetch_leases(events)
+        for (sport_id, event_id), lease in leases.items():
             # Queue the individual fetch task
-            fetch_and_store_odds.delay(sport_id, event_id)
-        
-        print(f"[SUCCESS] Queued odds fetch tasks for {total_events} events")
+            fetch_and_store_odds.apply_async(
+                (sport_id, event_id),
+                {"lease": lease},
+                headers={DISPATCHED_AT_HEADER: time.time()},
+            )
+
+        if events:
+            print(f"[SUCCESS] Queued odds fetch tasks for {len(leases)} events, "
+                  f"{len(events) - len(leases)} still in flight (shedding level {level})")
         
     except Exception as e:
         print(f"[ERROR] Failed to queue odds fetch tasks: {e}")
 
 
+@shared_task
+def fetch_sport_highlights(sport_id: int, lease: str = None):
+    """
+    Task to refresh the headline markets of every event of a sport with one upstream call
+    """
+    try:
+        summary = refresh_sport_highlights(sport_id)
+
+        if summary is None:
+            print(f"[WARNING] No highlight data received for sport_id: {sport_id}")
+            return
+
+        print(f"[SUCCESS] Refreshed highlight odds for sport_id: {sport_id} - {summary}")
+
+    except Exception as e:
+        print(f"[ERROR] Failed to fetch/store highlight odds for sport_id: {sport_id} - {e}")
+    finally:
+        release_fetch_lease(sport_id, HIGHLIGHT_LEASE_EVENT, lease)
+
+
+@shared_task
+def fetch_highlights_for_all_sports():
+    """
+    Queue one highlight fetch per sport that has events (bulk ingestion mode).
+    """
+    from django.conf import settings
+    if not settings.ODDS_BULK_INGESTION_ENABLED:
+        return
+
+    try:
+        sport_ids = (
+            Sport.objects.filter(events__isnull=False, event_type_id__isnull=False)
+            .values_list("event_type_id", flat=True)
+            .distinct()
+        )
+        leases = acquire_fetch_leases((sport_id, HIGHLIGHT_LEASE_EVENT) for sport_id in sport_ids)
+        for (sport_id, _), lease in leases.items():
+            fetch_sport_highlights.apply_async(
+                (sport_id,),
+                {"lease": lease},
+                headers={DISPATCHED_AT_HEADER: time.time()},
+            )
+
+    except Exception as e:
+        print(f"[ERROR] Failed to queue highlight fetch tasks: {e}")
+
+
+@shared_task
+def renew_g_token():
+    """
+    Periodic task to renew G_TOKEN before it expires
+    """
+    from django.conf import settings
+    if settings.G_TOKEN_BROKER_ENABLED:
+        # the run_token_broker process renews the token itself
+        return
+
+    try:
+        if renew_token_if_expiring():
+            print("[SUCCESS] Renewed G_TOKEN")
+    except Exception as e:
+        print(f"[ERROR] Failed to renew G_TOKEN (age: {get_token_age()}) - {e}")
+
+
 @shared_task
 def save_market_ids_task(event_id: str, sport_id: int, password: str):
     """
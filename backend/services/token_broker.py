@@ -0,0 +1,60 @@
+import logging
+import time
+
+from backend.services.redis_service import redis_service
+from backend.services.token_manager import (
+    G_TOKEN_REQUESTS_KEY,
+    refresh_token,
+    renew_token_if_expiring,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBroker:
+    """
+    The one process that logs in to upstream and publishes G_TOKEN to Redis.
+
+    It keeps a warm browser (see TokenBrowser), serves the refresh requests
+    that fetch_api pushes on G_TOKEN_REQUESTS_KEY, and renews the token
+    before it expires. Web and worker processes then only read G_TOKEN and
+    never import Selenium.
+    """
+
+    def __init__(self, check_interval: float = 60.0):
+        # Selenium is only ever imported by the broker process
+        from backend.services.gtoken_get_service import TokenBrowser
+
+        self.check_interval = check_interval
+        self.browser = TokenBrowser()
+        self._last_check = 0.0
+
+    def run_forever(self) -> None:
+        try:
+            while True:
+                try:
+                    self.run_once()
+                except Exception as e:
+                    logger.error(f"Token broker refresh failed: {e}")
+                    time.sleep(1)
+        finally:
+            self.browser.close()
+
+    def run_once(self, wait: float = 1.0) -> None:
+        # short blocking pop: stays below the Redis client's socket timeout
+        request = redis_service.redis_client.blpop([G_TOKEN_REQUESTS_KEY], timeout=wait)
+        if request is not None:
+            stale = request[1] or None
+            queued = redis_service.redis_client.llen(G_TOKEN_REQUESTS_KEY)
+            try:
+                refresh_token(stale=stale, fetch_token=self.browser.fetch_token)
+            except Exception:
+                # put the request back so the next loop retries the login
+                redis_service.redis_client.lpush(G_TOKEN_REQUESTS_KEY, request[1])
+                raise
+            # one login answered every request queued before it started
+            redis_service.redis_client.ltrim(G_TOKEN_REQUESTS_KEY, queued, -1)
+
+        if time.monotonic() - self._last_check >= self.check_interval:
+            self._last_check = time.monotonic()
+            renew_token_if_expiring(fetch_token=self.browser.fetch_token)
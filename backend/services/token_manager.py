@@ -0,0 +1,139 @@
+import logging
+import time
+import uuid
+from typing import Callable, Optional
+
+from django.conf import settings
+
+from backend.services import metrics
+from backend.services.redis_service import redis_service
+
+logger = logging.getLogger(__name__)
+
+# Upstream session cookie ("g_token=...;") shared by every process
+REDIS_KEY_G_TOKEN = "G_TOKEN"
+G_TOKEN_ISSUED_AT_KEY = "G_TOKEN:issued_at"
+
+# Held by the one process refreshing the token
+G_TOKEN_LOCK_KEY = "G_TOKEN:lock"
+
+# Refresh requests for the token broker (run_token_broker); each holds the rejected token
+G_TOKEN_REQUESTS_KEY = "G_TOKEN:requests"
+
+
+def get_token() -> Optional[str]:
+    """
+    Current G_TOKEN cookie value, or None when there is none.
+    """
+    try:
+        return redis_service.redis_client.get(REDIS_KEY_G_TOKEN)
+    except Exception as e:
+        logger.error(f"Error reading G_TOKEN from Redis: {e}")
+        return None
+
+
+def get_token_age() -> Optional[float]:
+    """
+    Seconds since the current G_TOKEN was issued, or None when unknown.
+    """
+    try:
+        issued_at = redis_service.redis_client.get(G_TOKEN_ISSUED_AT_KEY)
+    except Exception as e:
+        logger.error(f"Error reading G_TOKEN age from Redis: {e}")
+        return None
+    return max(0.0, time.time() - float(issued_at)) if issued_at else None
+
+
+def refresh_token(stale: Optional[str] = None, fetch_token: Optional[Callable[[], str]] = None) -> str:
+    """
+    Get a new G_TOKEN, making sure only one refresh runs at a time across all processes.
+
+    `stale` is the token the caller found rejected (None when it found no
+    token). With G_TOKEN_BROKER_ENABLED, callers only ask the token broker
+    for a refresh and wait for it. Otherwise (or when called by the broker
+    itself with its `fetch_token`) the caller that takes G_TOKEN_LOCK_KEY
+    runs the browser login. Either way everyone else polls Redis until a
+    token other than `stale` shows up, so hundreds of concurrent 401s still
+    cost one login.
+    """
+    lock = uuid.uuid4().hex
+    deadline = time.monotonic() + settings.G_TOKEN_WAIT_TIMEOUT
+    use_broker = fetch_token is None and settings.G_TOKEN_BROKER_ENABLED
+    if use_broker:
+        request_token_refresh(stale)
+
+    while time.monotonic() < deadline:
+        current = get_token()
+        if current and current != stale:
+            return current
+
+        if not use_broker and redis_service.redis_client.set(
+            G_TOKEN_LOCK_KEY, lock, ex=int(settings.G_TOKEN_LOCK_TTL), nx=True
+        ):
+            try:
+                # another process may have finished a refresh right before we got the lock
+                current = get_token()
+                if current and current != stale:
+                    return current
+                return _run_refresh(fetch_token)
+            finally:
+                redis_service.delete_if_equal(G_TOKEN_LOCK_KEY, lock)
+
+        metrics.incr("g_token.waits")
+        time.sleep(settings.G_TOKEN_WAIT_POLL)
+
+    raise Exception("Timed out waiting for G_TOKEN refresh")
+
+
+def request_token_refresh(stale: Optional[str] = None) -> None:
+    """
+    Ask the token broker to replace `stale` (or to issue a token when there is none).
+    """
+    pipeline = redis_service.redis_client.pipeline()
+    pipeline.rpush(G_TOKEN_REQUESTS_KEY, stale or "")
+    pipeline.ltrim(G_TOKEN_REQUESTS_KEY, -100, -1)
+    pipeline.execute()
+
+
+def renew_token_if_expiring(fetch_token: Optional[Callable[[], str]] = None) -> Optional[str]:
+    """
+    Refresh G_TOKEN ahead of its expiry, so requests never find it missing.
+
+    Returns the new token, or None when the current one is still fresh.
+    """
+    token = get_token()
+    age = get_token_age()
+    if age is not None:
+        metrics.set_gauge("g_token.age_seconds", round(age))
+
+    if token and age is not None and age < settings.G_TOKEN_TTL - settings.G_TOKEN_RENEW_BEFORE:
+        return None
+    return refresh_token(stale=token, fetch_token=fetch_token)
+
+
+def _run_refresh(fetch_token: Optional[Callable[[], str]] = None) -> str:
+    if fetch_token is None:
+        # Selenium is only imported by the process that actually refreshes
+        from backend.services.gtoken_get_service import get_cookie_token
+        fetch_token = get_cookie_token
+
+    started = time.monotonic()
+    try:
+        token = fetch_token()
+        if not token:
+            raise Exception("g_token cookie not found after login")
+    except Exception:
+        metrics.incr("g_token.refresh_failures")
+        raise
+    finally:
+        metrics.observe("g_token.refresh_seconds", time.monotonic() - started)
+
+    pipeline = redis_service.redis_client.pipeline()
+    pipeline.setex(REDIS_KEY_G_TOKEN, int(settings.G_TOKEN_TTL), token)
+    pipeline.setex(G_TOKEN_ISSUED_AT_KEY, int(settings.G_TOKEN_TTL), time.time())
+    pipeline.execute()
+
+    metrics.incr("g_token.refreshes")
+    metrics.set_gauge("g_token.age_seconds", 0)
+    logger.info(f"G_TOKEN refreshed in {time.monotonic() - started:.1f}s")
+    return token
@@ -0,0 +1,226 @@
+import threading
+import time
+from collections import deque
+from typing import Dict, Optional
+from urllib.parse import urlparse
+
+from django.conf import settings
+
+from backend.services import metrics
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling an upstream endpoint whose circuit is open."""
+
+
+class ConcurrencyLimitError(Exception):
+    """Raised when no upstream slot of an endpoint frees up in time."""
+
+
+class CircuitBreaker:
+    """
+    Per-process circuit breaker for one upstream endpoint.
+
+    After `failure_threshold` consecutive failures (timeouts, connection
+    errors, 429/5xx) the circuit opens and calls fail fast for
+    `reset_timeout` seconds. Then it goes half-open: a single probe call is
+    let through, and its outcome closes the circuit or opens it again.
+    """
+
+    def __init__(self, name: str, failure_threshold: int, reset_timeout: float):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+
+        self._lock = threading.Lock()
+        self.state = CLOSED
+        self.failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.state == CLOSED:
+                return True
+            if self.state == OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+                self._set_state(HALF_OPEN)
+            if self.state == HALF_OPEN and not self._probing:
+                self._probing = True
+                return True
+        metrics.incr(f"upstream.{self.name}.rejected")
+        return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.failures = 0
+            self._probing = False
+            if self.state != CLOSED:
+                self._set_state(CLOSED)
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            self._probing = False
+            if self.state == HALF_OPEN or (self.state == CLOSED and self.failures >= self.failure_threshold):
+                self._opened_at = time.monotonic()
+                self._set_state(OPEN)
+                metrics.incr(f"upstream.{self.name}.breaker_opened")
+
+    def _set_state(self, state: str) -> None:
+        # caller holds the lock
+        self.state = state
+        metrics.set_gauge(f"upstream.{self.name}.breaker", state)
+
+
+class LatencyWindow:
+    """
+    Latencies of the last `size` calls, for percentile-based hedging delays.
+    """
+
+    def __init__(self, size: int = 200):
+        self._lock = threading.Lock()
+        self._samples = deque(maxlen=size)
+
+    def record(self, seconds: float) -> None:
+        with self._lock:
+            self._samples.append(seconds)
+
+    def percentile(self, pct: float) -> Optional[float]:
+        with self._lock:
+            samples = sorted(self._samples)
+        if len(samples) < 20:
+            return None  # not enough data yet to trust the tail
+        return samples[min(len(samples) - 1, int(len(samples) * pct / 100))]
+
+
+class AdaptiveLimiter:
+    """
+    Per-process AIMD concurrency limit for one upstream endpoint.
+
+    Every healthy call raises the limit by 1/limit (about +1 per round of
+    calls); a 429, 5xx, timeout or a latency spike (above `latency_factor`
+    times the endpoint's median) multiplies it by `backoff`, at most once
+    per `cooldown` so one burst of failures counts as one signal.
+    """
+
+    def __init__(self, name: str, initial: float, min_limit: float, max_limit: float,
+                 backoff: float, latency_factor: float, cooldown: float):
+        self.name = name
+        self.limit = initial
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.backoff = backoff
+        self.latency_factor = latency_factor
+        self.cooldown = cooldown
+
+        self._condition = threading.Condition()
+        self.in_flight = 0
+        self._last_backoff = 0.0
+
+    def acquire(self, timeout: float) -> None:
+        deadline = time.monotonic() + timeout
+        with self._condition:
+            while self.in_flight >= int(self.limit):
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    metrics.incr(f"upstream.{self.name}.limited")
+                    raise ConcurrencyLimitError(
+                        f"Upstream {self.name} concurrency limit ({int(self.limit)}) reached"
+                    )
+                self._condition.wait(remaining)
+            self.in_flight += 1
+
+    def cancel(self) -> None:
+        """
+        Free a slot that was never used for a call, without adapting the limit.
+        """
+        with self._condition:
+            self.in_flight -= 1
+            self._condition.notify()
+
+    def release(self, ok: bool, latency: Optional[float] = None, baseline: Optional[float] = None) -> None:
+        """
+        Free a slot and adapt the limit. `ok` is False for 429/5xx/errors;
+        `baseline` is the endpoint's typical latency (None while unknown).
+        """
+        spike = ok and latency is not None and baseline is not None and latency > baseline * self.latency_factor
+        with self._condition:
+            self.in_flight -= 1
+            if ok and not spike:
+                self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+            elif time.monotonic() - self._last_backoff >= self.cooldown:
+                self._last_backoff = time.monotonic()
+                self.limit = max(self.min_limit, self.limit * self.backoff)
+                metrics.incr(f"upstream.{self.name}.backoffs")
+            self._condition.notify_all()
+            limit, in_flight = self.limit, self.in_flight
+        metrics.set_gauge(f"upstream.{self.name}.limit", round(limit, 2))
+        metrics.set_gauge(f"upstream.{self.name}.in_flight", in_flight)
+
+
+class EndpointGuard:
+    """
+    Resilience state kept per upstream endpoint (gamedataPrivate, highlighthomePrivate, ...).
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.breaker = CircuitBreaker(
+            name,
+            failure_threshold=settings.UPSTREAM_BREAKER_FAILURES,
+            reset_timeout=settings.UPSTREAM_BREAKER_RESET,
+        )
+        self.latency = LatencyWindow()
+        self.limiter = AdaptiveLimiter(
+            name,
+            initial=settings.UPSTREAM_AIMD_INITIAL,
+            min_limit=settings.UPSTREAM_AIMD_MIN,
+            max_limit=settings.UPSTREAM_AIMD_MAX,
+            backoff=settings.UPSTREAM_AIMD_BACKOFF,
+            latency_factor=settings.UPSTREAM_AIMD_LATENCY_FACTOR,
+            cooldown=settings.UPSTREAM_AIMD_COOLDOWN,
+        )
+
+    def hedge_delay(self) -> float:
+        """
+        How long to wait for the first attempt before firing a hedged one.
+        """
+        tail = self.latency.percentile(settings.UPSTREAM_HEDGE_PERCENTILE)
+        return max(settings.UPSTREAM_HEDGE_MIN_DELAY, tail or 0.0)
+
+
+_guards: Dict[str, EndpointGuard] = {}
+_guards_lock = threading.Lock()
+
+
+def endpoint_name(url: str) -> str:
+    """
+    Last path segment of an upstream URL ("gamedataPrivate", "treedata", ...).
+    """
+    path = urlparse(url).path.rstrip("/")
+    return path.rsplit("/", 1)[-1] or "root"
+
+
+def get_endpoint_guard(url: str) -> EndpointGuard:
+    name = endpoint_name(url)
+    guard = _guards.get(name)
+    if guard is None:
+        with _guards_lock:
+            guard = _guards.setdefault(name, EndpointGuard(name))
+    return guard
+
+
+def alternate_url(url: str) -> str:
+    """
+    The same upstream call on another base URL of UPSTREAM_BASE_URLS (or the
+    same URL when there is no other base), for hedged attempts.
+    """
+    bases = settings.UPSTREAM_BASE_URLS
+    for index, base in enumerate(bases):
+        if url.startswith(base):
+            return bases[(index + 1) % len(bases)] + url[len(base):]
+    return url
@@ -92,7 +92,7 @@ WSGI_APPLICATION = "backend.wsgi.application"
 DATABASES = {
     "default": {
         "ENGINE": "django.db.backends.postgresql",
-        "NAME": os.getenv("DB_NAME"),
+        "NAME": os.getenv("DB_NAME", "d247"),  # same default as the compose db service
         "USER": os.getenv("DB_USER"),
         "PASSWORD": os.getenv("DB_PASSWORD"),
         "HOST": os.getenv("POSTGRES_HOST", "db"),
@@ -131,6 +131,143 @@ CELERY_BEAT_SCHEDULE = {
     },
 }
 
+# -----------------------------------------------------------------------------
+# Odds
+# -----------------------------------------------------------------------------
+# Per-process cache of odds documents read by the API, invalidated over pub/sub
+ODDS_LOCAL_CACHE_ENABLED = os.getenv("ODDS_LOCAL_CACHE_ENABLED", "1") == "1"
+ODDS_LOCAL_CACHE_TTL = float(os.getenv("ODDS_LOCAL_CACHE_TTL", 1.0))  # seconds
+ODDS_LOCAL_CACHE_MAX_ENTRIES = int(os.getenv("ODDS_LOCAL_CACHE_MAX_ENTRIES", 5000))
+ODDS_LOCAL_CACHE_MAX_BYTES = int(os.getenv("ODDS_LOCAL_CACHE_MAX_BYTES", 64 * 1024 * 1024))
+ODDS_LOCAL_CACHE_STATS = os.getenv("ODDS_LOCAL_CACHE_STATS", "1") == "1"
+
+# Also store each event as a hash (header + one field per market), so filtered
+# odds requests HMGET only the markets they ask for
+ODDS_PROJECTION_ENABLED = os.getenv("ODDS_PROJECTION_ENABLED", "1") == "1"
+
+# Store odds documents of at least ODDS_COMPRESSION_MIN_BYTES gzipped; clients
+# sending Accept-Encoding: gzip get the stored bytes without recompression
+ODDS_COMPRESSION_ENABLED = os.getenv("ODDS_COMPRESSION_ENABLED", "1") == "1"
+ODDS_COMPRESSION_MIN_BYTES = int(os.getenv("ODDS_COMPRESSION_MIN_BYTES", 4096))
+ODDS_COMPRESSION_LEVEL = int(os.getenv("ODDS_COMPRESSION_LEVEL", 5))  # 1 (fastest) .. 9 (smallest)
+
+# "celery": the 1s beat enqueues one fetch_and_store_odds task per event
+# "engine": the run_odds_engine process refreshes all events itself
+ODDS_INGESTION_MODE = os.getenv("ODDS_INGESTION_MODE", "celery")
+ODDS_ENGINE_CONCURRENCY = int(os.getenv("ODDS_ENGINE_CONCURRENCY", 32))
+ODDS_ENGINE_INTERVAL = float(os.getenv("ODDS_ENGINE_INTERVAL", 1.0))  # seconds between cycles
+ODDS_ENGINE_DEADLINE = float(os.getenv("ODDS_ENGINE_DEADLINE", 1.0))  # fetches not started by then are dropped
+# Decrypt/convert in this many processes, apart from the fetch threads (0 = inline in the threads)
+ODDS_ENGINE_CPU_WORKERS = int(os.getenv("ODDS_ENGINE_CPU_WORKERS", os.cpu_count() or 1))
+ODDS_ENGINE_CPU_QUEUE = int(os.getenv("ODDS_ENGINE_CPU_QUEUE", 4 * ODDS_ENGINE_CPU_WORKERS))  # fetched responses waiting to decode
+# Converted markets kept per process for reuse while their raw data is unchanged (0 = off)
+ODDS_CONVERT_CACHE_SIZE = int(os.getenv("ODDS_CONVERT_CACHE_SIZE", 50000))
+# Sport names used by odds conversion are reloaded from Redis this often (seconds)
+SPORT_NAMES_CACHE_TTL = float(os.getenv("SPORT_NAMES_CACHE_TTL", 60))
+
+# Adaptive polling: each event gets its own refresh interval (seconds)
+ODDS_SCHEDULE_ENABLED = os.getenv("ODDS_SCHEDULE_ENABLED", "1") == "1"
+ODDS_SCHEDULE_INPLAY_INTERVAL = float(os.getenv("ODDS_SCHEDULE_INPLAY_INTERVAL", 1.0))
+ODDS_SCHEDULE_STARTING_INTERVAL = float(os.getenv("ODDS_SCHEDULE_STARTING_INTERVAL", 5))  # opens within the hour
+ODDS_SCHEDULE_PREMATCH_INTERVAL = float(os.getenv("ODDS_SCHEDULE_PREMATCH_INTERVAL", 15))  # opens within a day
+ODDS_SCHEDULE_FUTURE_INTERVAL = float(os.getenv("ODDS_SCHEDULE_FUTURE_INTERVAL", 60))  # opens later
+ODDS_SCHEDULE_MAX_INTERVAL = float(os.getenv("ODDS_SCHEDULE_MAX_INTERVAL", 120))  # pre-match ceiling
+ODDS_SCHEDULE_UNCHANGED_BACKOFF = float(os.getenv("ODDS_SCHEDULE_UNCHANGED_BACKOFF", 1.5))  # per unchanged pre-match fetch
+ODDS_SCHEDULE_SUSPENDED_BACKOFF = float(os.getenv("ODDS_SCHEDULE_SUSPENDED_BACKOFF", 3))
+ODDS_SCHEDULE_CLOSED_INTERVAL = float(os.getenv("ODDS_SCHEDULE_CLOSED_INTERVAL", 300))
+ODDS_SCHEDULE_SYNC_INTERVAL = float(os.getenv("ODDS_SCHEDULE_SYNC_INTERVAL", 30))  # new/deleted events picked up
+
+# A fetch lease per event keeps at most one odds fetch queued or running for it
+ODDS_FETCH_LEASE_TTL = float(os.getenv("ODDS_FETCH_LEASE_TTL", 30))  # seconds, bounds how long a lost task blocks its event
+
+# Backpressure: shed low-priority dispatches when the Celery queue backs up
+# (level 1 sheds pre-match events opening later than an hour, level 2 keeps in-play only)
+ODDS_BACKPRESSURE_ENABLED = os.getenv("ODDS_BACKPRESSURE_ENABLED", "1") == "1"
+ODDS_BACKPRESSURE_QUEUE = os.getenv("ODDS_BACKPRESSURE_QUEUE", "celery")
+ODDS_BACKPRESSURE_LAG_LEVEL1 = float(os.getenv("ODDS_BACKPRESSURE_LAG_LEVEL1", 2))  # seconds oldest task waited
+ODDS_BACKPRESSURE_LAG_LEVEL2 = float(os.getenv("ODDS_BACKPRESSURE_LAG_LEVEL2", 5))
+ODDS_BACKPRESSURE_DEPTH_LEVEL1 = int(os.getenv("ODDS_BACKPRESSURE_DEPTH_LEVEL1", 500))  # queued tasks
+ODDS_BACKPRESSURE_DEPTH_LEVEL2 = int(os.getenv("ODDS_BACKPRESSURE_DEPTH_LEVEL2", 2000))
+
+# Bulk ingestion: one highlighthomePrivate call per sport refreshes the headline
+# markets of its events; only in-play and watched events get the per-event fetch
+ODDS_BULK_INGESTION_ENABLED = os.getenv("ODDS_BULK_INGESTION_ENABLED", "0") == "1"
+ODDS_BULK_INTERVAL = float(os.getenv("ODDS_BULK_INTERVAL", 2.0))  # seconds between highlight fetches
+ODDS_BULK_STALE_AFTER = float(os.getenv("ODDS_BULK_STALE_AFTER", 30))  # fall back to per-event fetch after this
+ODDS_WATCH_TTL = float(os.getenv("ODDS_WATCH_TTL", 60))  # an event stays watched this long after a client read it
+ODDS_WATCH_MARK_INTERVAL = float(os.getenv("ODDS_WATCH_MARK_INTERVAL", 5))  # per-process write throttle
+
+if ODDS_BULK_INGESTION_ENABLED:
+    CELERY_BEAT_SCHEDULE["fetch-highlights-per-sport"] = {
+        "task": "backend.services.tasks.fetch_highlights_for_all_sports",
+        "schedule": ODDS_BULK_INTERVAL,
+    }
+
+# Server-Sent Events stream (/api/odds/stream/, served by backend.asgi)
+ODDS_STREAM_QUEUE_SIZE = int(os.getenv("ODDS_STREAM_QUEUE_SIZE", 100))  # deltas buffered per client
+ODDS_STREAM_KEEPALIVE = float(os.getenv("ODDS_STREAM_KEEPALIVE", 15))  # seconds
+
+# -----------------------------------------------------------------------------
+# Upstream HTTP (d247)
+# -----------------------------------------------------------------------------
+# Keep-alive pool shared by every fetch_api call of a process
+UPSTREAM_POOL_CONNECTIONS = int(os.getenv("UPSTREAM_POOL_CONNECTIONS", 4))  # hosts kept pooled
+UPSTREAM_POOL_MAXSIZE = int(os.getenv("UPSTREAM_POOL_MAXSIZE", 32))  # connections per host
+UPSTREAM_POOL_BLOCK = os.getenv("UPSTREAM_POOL_BLOCK", "1") == "1"  # wait for a free connection instead of opening more
+UPSTREAM_MAX_RETRIES = int(os.getenv("UPSTREAM_MAX_RETRIES", 2))  # connect errors only
+UPSTREAM_RETRY_BACKOFF = float(os.getenv("UPSTREAM_RETRY_BACKOFF", 0.1))  # seconds
+
+# Per-endpoint circuit breaker: opens after N consecutive failures, probes again after the reset time
+UPSTREAM_BREAKER_FAILURES = int(os.getenv("UPSTREAM_BREAKER_FAILURES", 5))
+UPSTREAM_BREAKER_RESET = float(os.getenv("UPSTREAM_BREAKER_RESET", 10))  # seconds
+
+# Adaptive (AIMD) concurrency limit per endpoint and process: grows while calls are
+# healthy, shrinks on 429/5xx/timeouts or latency above LATENCY_FACTOR x the median
+UPSTREAM_AIMD_ENABLED = os.getenv("UPSTREAM_AIMD_ENABLED", "1") == "1"
+UPSTREAM_AIMD_INITIAL = float(os.getenv("UPSTREAM_AIMD_INITIAL", 8))
+UPSTREAM_AIMD_MIN = float(os.getenv("UPSTREAM_AIMD_MIN", 1))
+UPSTREAM_AIMD_MAX = float(os.getenv("UPSTREAM_AIMD_MAX", UPSTREAM_POOL_MAXSIZE))
+UPSTREAM_AIMD_BACKOFF = float(os.getenv("UPSTREAM_AIMD_BACKOFF", 0.5))
+UPSTREAM_AIMD_LATENCY_FACTOR = float(os.getenv("UPSTREAM_AIMD_LATENCY_FACTOR", 3))
+UPSTREAM_AIMD_COOLDOWN = float(os.getenv("UPSTREAM_AIMD_COOLDOWN", 1))  # seconds between two backoffs
+
+# Hedged requests: when a call is slower than the endpoint's recent latency percentile,
+# a second attempt goes to the next base URL and the first answer wins
+UPSTREAM_HEDGE_ENABLED = os.getenv("UPSTREAM_HEDGE_ENABLED", "0") == "1"
+UPSTREAM_HEDGE_PERCENTILE = float(os.getenv("UPSTREAM_HEDGE_PERCENTILE", 95))
+UPSTREAM_HEDGE_MIN_DELAY = float(os.getenv("UPSTREAM_HEDGE_MIN_DELAY", 0.15))  # seconds
+UPSTREAM_HEDGE_WORKERS = int(os.getenv("UPSTREAM_HEDGE_WORKERS", 64))
+UPSTREAM_BASE_URLS = list(dict.fromkeys(
+    url.strip().rstrip("/")
+    for url in os.getenv("UPSTREAM_BASE_URLS", f"https://d247.com/api,{os.getenv('BASE_URL', '')}").split(",")
+    if url.strip()
+))
+
+# Encrypted request envelopes ({etid, gmid}, ...) are reused for this long per payload
+CRYPT_ENVELOPE_TTL = float(os.getenv("CRYPT_ENVELOPE_TTL", 300))  # seconds
+
+# G_TOKEN session cookie: refreshed by one process at a time, renewed before expiry.
+# With the broker enabled only the run_token_broker process logs in (warm browser);
+# web and worker processes just read the token and ask the broker for a new one.
+G_TOKEN_BROKER_ENABLED = os.getenv("G_TOKEN_BROKER_ENABLED", "1") == "1"
+G_TOKEN_TTL = float(os.getenv("G_TOKEN_TTL", 3600))  # seconds
+G_TOKEN_RENEW_BEFORE = float(os.getenv("G_TOKEN_RENEW_BEFORE", 600))  # renew when this close to expiry
+G_TOKEN_RENEW_CHECK_INTERVAL = float(os.getenv("G_TOKEN_RENEW_CHECK_INTERVAL", 60))
+G_TOKEN_LOCK_TTL = float(os.getenv("G_TOKEN_LOCK_TTL", 90))  # longer than one browser login
+G_TOKEN_WAIT_TIMEOUT = float(os.getenv("G_TOKEN_WAIT_TIMEOUT", 120))  # how long callers wait for a refresh
+G_TOKEN_WAIT_POLL = float(os.getenv("G_TOKEN_WAIT_POLL", 0.5))
+
+CELERY_BEAT_SCHEDULE["renew-g-token"] = {
+    "task": "backend.services.tasks.renew_g_token",
+    "schedule": G_TOKEN_RENEW_CHECK_INTERVAL,
+}
+
+# -----------------------------------------------------------------------------
+# Metrics
+# -----------------------------------------------------------------------------
+# How often each process pushes its counters to Redis (seconds)
+METRICS_FLUSH_INTERVAL = float(os.getenv("METRICS_FLUSH_INTERVAL", 10))
+
 # -----------------------------------------------------------------------------
 # Authentication & Security
 # -----------------------------------------------------------------------------
@@ -0,0 +1,76 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from backend.services.crypt_service import CryptCodec, decrypt_data, encrypt_data
+
+
+def _sample_response(markets: int):
+    # roughly the shape of a gamedataPrivate response
+    return {
+        "success": True,
+        "data": [
+            {
+                "mid": 1000 + m,
+                "mname": f"Market {m}",
+                "status": "OPEN",
+                "section": [
+                    {
+                        "sid": s,
+                        "nat": f"Runner {s}",
+                        "odds": [
+                            {"otype": otype, "odds": 1.5 + level / 100, "size": 1000 + level, "tno": level}
+                            for otype in ("back", "lay")
+                            for level in range(3)
+                        ],
+                    }
+                    for s in range(3)
+                ],
+            }
+            for m in range(markets)
+        ],
+    }
+
+
+class Command(BaseCommand):
+    help = "Measure per-call CPU of encrypt_data/decrypt_data against the cached CryptCodec"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--iterations", type=int, default=2000)
+        parser.add_argument("--markets", type=int, default=40, help="Markets in the sample response")
+        parser.add_argument("--password", default="benchmark-password")
+
+    def handle(self, *args, **options):
+        iterations = options["iterations"]
+        password = options["password"]
+        codec = CryptCodec(password)
+
+        request = {"etid": 4, "gmid": 123456789}
+        # upstream salts every response: distinct ciphertexts miss the key LRU
+        responses = [encrypt_data(_sample_response(options["markets"]), password) for _ in range(iterations)]
+        size = len(responses[0])
+
+        results = [
+            ("request  encrypt_data", lambda i: encrypt_data(request, password)),
+            ("request  codec.encrypt", lambda i: codec.encrypt(request)),
+            ("response decrypt_data", lambda i: decrypt_data(responses[i], password)),
+            ("response codec.decrypt (new salt)", lambda i: codec.decrypt(responses[i])),
+            ("response codec.decrypt (known salt)", lambda i: codec.decrypt(responses[0])),
+        ]
+
+        self.stdout.write(f"{iterations} calls, response {size} bytes (base64)")
+        baseline = {}
+        for name, call in results:
+            per_call = self._measure(call, iterations)
+            kind = name.split()[0]
+            baseline.setdefault(kind, per_call)
+            self.stdout.write(
+                f"{name:<38} {per_call * 1e6:9.1f} us/call  x{baseline[kind] / per_call:.1f}"
+            )
+
+    def _measure(self, call, iterations: int) -> float:
+        call(0)  # warm up caches
+        started = time.process_time()
+        for i in range(iterations):
+            call(i)
+        return (time.process_time() - started) / iterations
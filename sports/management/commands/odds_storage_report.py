@@ -0,0 +1,51 @@
+import orjson
+from django.core.management.base import BaseCommand
+
+from backend.services import metrics
+from backend.services.redis_service import redis_service
+from backend.services.store_odds_service import decode_stored_odds, get_odds_index_key, is_gzipped
+
+
+class Command(BaseCommand):
+    help = "Report how much Redis memory the compressed odds documents save (see ODDS_COMPRESSION_*)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch", type=int, default=500, help="Documents read per MGET")
+
+    def handle(self, *args, **options):
+        batch = options["batch"]
+        totals = {"documents": 0, "gzipped": 0, "stored": 0, "json": 0}
+
+        # SCAN, not KEYS: the report must not block Redis for the API
+        keys = []
+        for index_key in redis_service.redis_client.scan_iter(match=get_odds_index_key("*"), count=batch):
+            keys.append(index_key)
+            if len(keys) >= batch:
+                self._measure(keys, totals)
+                keys = []
+        if keys:
+            self._measure(keys, totals)
+
+        saved = totals["json"] - totals["stored"]
+        ratio = totals["json"] / totals["stored"] if totals["stored"] else 1.0
+        metrics.set_gauge("odds_store.documents", totals["documents"])
+        metrics.set_gauge("odds_store.documents_stored_bytes", totals["stored"])
+        metrics.set_gauge("odds_store.memory_saved_bytes", saved)
+        metrics.flush()
+
+        self.stdout.write(
+            f"{totals['documents']} documents ({totals['gzipped']} gzipped): "
+            f"{totals['json'] / 1024:.1f} KiB as JSON, {totals['stored'] / 1024:.1f} KiB stored, "
+            f"ratio x{ratio:.2f}, {saved / 1024:.1f} KiB saved"
+        )
+
+    def _measure(self, index_keys, totals) -> None:
+        indexes = redis_service.get_multiple_raw(index_keys)
+        keys = [orjson.loads(raw)["key"] for raw in indexes.values() if raw]
+        for stored in redis_service.get_multiple_bytes(keys).values():
+            if not stored:
+                continue
+            totals["documents"] += 1
+            totals["gzipped"] += is_gzipped(stored)
+            totals["stored"] += len(stored)
+            totals["json"] += len(decode_stored_odds(stored))
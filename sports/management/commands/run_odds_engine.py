@@ -0,0 +1,51 @@
+import asyncio
+import logging
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from backend.services.odds_engine import OddsFetchEngine
+
+
+class Command(BaseCommand):
+    help = "Refresh odds for all events with the asyncio fetch engine (set ODDS_INGESTION_MODE=engine)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--concurrency", type=int, default=settings.ODDS_ENGINE_CONCURRENCY)
+        parser.add_argument("--interval", type=float, default=settings.ODDS_ENGINE_INTERVAL)
+        parser.add_argument("--deadline", type=float, default=settings.ODDS_ENGINE_DEADLINE)
+        parser.add_argument("--cpu-workers", type=int, default=settings.ODDS_ENGINE_CPU_WORKERS,
+                            help="Decrypt/convert processes (0 = inline in the fetch threads)")
+        parser.add_argument("--cpu-queue", type=int, default=settings.ODDS_ENGINE_CPU_QUEUE)
+        parser.add_argument("--once", action="store_true", help="Run a single cycle and exit")
+
+    def handle(self, *args, **options):
+        logging.basicConfig(level=logging.INFO)
+        if settings.ODDS_INGESTION_MODE != "engine" and not options["once"]:
+            # beat still enqueues the odds tasks: running both would poll every event twice
+            self.stdout.write(self.style.WARNING(
+                f"ODDS_INGESTION_MODE is {settings.ODDS_INGESTION_MODE!r}, not 'engine': odds engine not started"
+            ))
+            return
+
+        engine = OddsFetchEngine(
+            concurrency=options["concurrency"],
+            interval=options["interval"],
+            deadline=options["deadline"],
+            cpu_workers=options["cpu_workers"],
+            cpu_queue=options["cpu_queue"],
+        )
+
+        if options["once"]:
+            summary = asyncio.run(engine.run_cycle())
+            self.stdout.write(self.style.SUCCESS(f"Odds cycle finished: {summary}"))
+            return
+
+        self.stdout.write(
+            f"Odds engine running: concurrency={engine.concurrency}, "
+            f"interval={engine.interval}s, deadline={engine.deadline}s, cpu_workers={engine.cpu_workers}"
+        )
+        try:
+            asyncio.run(engine.run_forever())
+        except KeyboardInterrupt:
+            pass
@@ -0,0 +1,23 @@
+import logging
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from backend.services.token_broker import TokenBroker
+
+
+class Command(BaseCommand):
+    help = "Keep a warm browser and publish G_TOKEN to Redis (set G_TOKEN_BROKER_ENABLED=1)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--check-interval", type=float, default=settings.G_TOKEN_RENEW_CHECK_INTERVAL)
+
+    def handle(self, *args, **options):
+        logging.basicConfig(level=logging.INFO)
+        broker = TokenBroker(check_interval=options["check_interval"])
+
+        self.stdout.write(f"Token broker running: check_interval={broker.check_interval}s")
+        try:
+            broker.run_forever()
+        except KeyboardInterrupt:
+            pass
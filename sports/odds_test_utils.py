@@ -0,0 +1,56 @@
+import fakeredis
+from django.test import SimpleTestCase, override_settings
+
+from backend.services.odds_model import OddsEvent, OddsMarket
+from backend.services.redis_service import redis_service
+from backend.services.store_odds_service import format_event_response
+
+
+def make_raw_market(mid, mname="Match Odds", status="OPEN", rate=1.5):
+    # one market of a gamedataPrivate response
+    return {
+        "mid": mid,
+        "mname": mname,
+        "status": status,
+        "iplay": True,
+        "min": 100,
+        "max": 5000,
+        "section": [
+            {
+                "sid": sid,
+                "nat": f"Runner {sid}",
+                "gstatus": "",
+                "odds": [
+                    {"otype": otype, "odds": rate + level / 100, "size": 100 + level, "tno": level}
+                    for otype in ("back", "lay")
+                    for level in range(3)
+                ],
+            }
+            for sid in range(2)
+        ],
+    }
+
+
+def make_event(raw_markets, event_id="9"):
+    markets = [OddsMarket.from_raw(raw, "MATCH_ODDS") for raw in raw_markets]
+    return OddsEvent(event_id, "A v B", True, "Cricket", 4, event_id, markets)
+
+
+def make_document(raw_markets):
+    return format_event_response(make_event(raw_markets).to_dict())
+
+
+@override_settings(ODDS_LOCAL_CACHE_ENABLED=False, ODDS_BULK_INGESTION_ENABLED=False, TAGLINE_SECRET_KEY="test-key")
+class RedisTestCase(SimpleTestCase):
+    """
+    Runs against an in-memory Redis shared by the text and binary clients of redis_service.
+    """
+
+    def setUp(self):
+        server = fakeredis.FakeServer()
+        self._clients = redis_service.redis_client, redis_service.binary_client
+        redis_service.redis_client = fakeredis.FakeRedis(server=server, decode_responses=True)
+        redis_service.binary_client = fakeredis.FakeRedis(server=server)
+
+    def tearDown(self):
+        redis_service.redis_client, redis_service.binary_client = self._clients
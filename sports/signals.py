@@ -0,0 +1,17 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+
+from backend.services.catalog_service import bump_catalog_version
+from .models import Competition, Event, Sport
+
+
+def catalog_changed(sender, **kwargs):
+    """
+    Any catalog write (tree sync, market ids, admin) invalidates the catalog ETags once committed.
+    """
+    transaction.on_commit(bump_catalog_version)
+
+
+for model in (Sport, Competition, Event):
+    post_save.connect(catalog_changed, sender=model, dispatch_uid=f"catalog_changed_save_{model.__name__}")
+    post_delete.connect(catalog_changed, sender=model, dispatch_uid=f"catalog_changed_delete_{model.__name__}")
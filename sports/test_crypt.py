@@ -0,0 +1,37 @@
+import time
+
+from django.test import SimpleTestCase
+
+from backend.services.crypt_service import CryptCodec, decrypt_data, encrypt_data
+
+
+class CryptCodecTests(SimpleTestCase):
+    password = "test-password"
+
+    def setUp(self):
+        self.codec = CryptCodec(self.password)
+        self.document = {"success": True, "data": [{"mid": 1, "mname": "Match Odds", "nat": "टीम"}]}
+
+    def test_codec_reads_encrypt_data(self):
+        self.assertEqual(self.codec.decrypt(encrypt_data(self.document, self.password)), self.document)
+
+    def test_decrypt_data_reads_codec_envelopes(self):
+        self.assertEqual(decrypt_data(self.codec.encrypt(self.document), self.password), self.document)
+
+    def test_plain_text_payloads(self):
+        self.assertEqual(self.codec.decrypt(encrypt_data("not json", self.password)), "not json")
+        self.assertEqual(decrypt_data(self.codec.encrypt("not json"), self.password), "not json")
+
+    def test_envelopes_are_reused_until_they_expire(self):
+        first = self.codec.encrypt(self.document)
+        self.assertEqual(self.codec.encrypt(self.document), first)
+        self.assertNotEqual(self.codec.encrypt({"other": 1}), first)
+
+        expiring = CryptCodec(self.password, envelope_ttl=0.01)
+        envelope = expiring.encrypt(self.document)
+        time.sleep(0.02)
+        self.assertNotEqual(expiring.encrypt(self.document), envelope)
+
+    def test_rejects_other_formats(self):
+        with self.assertRaises(ValueError):
+            self.codec.decrypt("bm90IHNhbHRlZA==")
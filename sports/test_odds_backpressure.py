@@ -0,0 +1,30 @@
+from datetime import datetime, timezone
+
+from django.test import SimpleTestCase, override_settings
+
+from backend.services.odds_backpressure import compute_shedding_level, shed_events
+
+
+class SheddingTests(SimpleTestCase):
+    @override_settings(ODDS_BACKPRESSURE_DEPTH_LEVEL1=500, ODDS_BACKPRESSURE_DEPTH_LEVEL2=2000,
+                       ODDS_BACKPRESSURE_LAG_LEVEL1=2, ODDS_BACKPRESSURE_LAG_LEVEL2=5)
+    def test_shedding_level(self):
+        self.assertEqual(compute_shedding_level(0, 0.0), 0)
+        self.assertEqual(compute_shedding_level(499, 1.9), 0)
+        self.assertEqual(compute_shedding_level(500, 0.0), 1)
+        self.assertEqual(compute_shedding_level(0, 2.0), 1)
+        self.assertEqual(compute_shedding_level(2000, 0.0), 2)
+        self.assertEqual(compute_shedding_level(10, 5.0), 2)
+
+    def test_shed_events_without_schedule(self):
+        now = 1_000_000.0
+        events = [
+            (4, "live", datetime.fromtimestamp(now - 600, timezone.utc)),
+            (4, "soon", datetime.fromtimestamp(now + 600, timezone.utc)),
+            (4, "later", datetime.fromtimestamp(now + 86400, timezone.utc)),
+            (4, "undated", None),
+        ]
+        self.assertEqual(shed_events(events, 0, now=now),
+                         [(4, "live"), (4, "soon"), (4, "later"), (4, "undated")])
+        self.assertEqual(shed_events(events, 1, now=now), [(4, "live"), (4, "soon")])
+        self.assertEqual(shed_events(events, 2, now=now), [(4, "live")])
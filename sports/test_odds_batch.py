@@ -0,0 +1,54 @@
+import orjson
+
+from backend.services.store_odds_service import store_event_odds
+from sports.odds_test_utils import RedisTestCase, make_event, make_raw_market
+
+
+class OddsBatchViewTests(RedisTestCase):
+    url = "/api/odds/batch/"
+
+    def setUp(self):
+        super().setUp()
+        for event_id in ("9", "10"):
+            raw_markets = [make_raw_market(1), make_raw_market(2, mname="Bookmaker")]
+            store_event_odds(4, event_id, make_event(raw_markets, event_id=event_id))
+
+    def post(self, body):
+        return self.client.post(self.url, data=body, content_type="application/json",
+                                HTTP_X_TAGLINE_SECRET_KEY="test-key")
+
+    def test_returns_every_requested_event(self):
+        response = self.post({"event_ids": ["9", "11", "10", "9"]})
+        self.assertEqual(response.status_code, 200)
+        data = orjson.loads(response.content)["data"]
+        self.assertEqual(list(data), ["9", "11", "10"])
+        self.assertIsNone(data["11"])
+        self.assertEqual(data["10"]["eventid"], "10")
+
+    def test_filters_markets(self):
+        data = orjson.loads(self.post({"event_ids": ["9"], "market_types": ["bookmaker"]}).content)["data"]
+        self.assertEqual(list(data["9"]["markets"]), ["Bookmaker"])
+
+        data = orjson.loads(self.post({"event_ids": ["9"], "market_ids": [1]}).content)["data"]
+        self.assertEqual(list(data["9"]["markets"]), ["Match Odds"])
+
+    def test_get_with_query_parameters(self):
+        response = self.client.get(self.url, {"event_ids": "9,10", "market_types": "Bookmaker"},
+                                   HTTP_X_TAGLINE_SECRET_KEY="test-key")
+        data = orjson.loads(response.content)["data"]
+        self.assertEqual([list(event["markets"]) for event in data.values()], [["Bookmaker"], ["Bookmaker"]])
+
+    def test_rejects_invalid_bodies(self):
+        for body in (
+            {},
+            {"event_ids": "9"},
+            {"event_ids": ["9"], "market_ids": "2"},
+            {"event_ids": ["9"], "market_types": "Bookmaker"},
+            {"event_ids": [str(event_id) for event_id in range(101)]},
+        ):
+            with self.subTest(body=body):
+                self.assertEqual(self.post(body).status_code, 400)
+
+    def test_requires_the_secret_key(self):
+        response = self.client.post(self.url, data={"event_ids": ["9"]}, content_type="application/json")
+        self.assertEqual(response.status_code, 403)
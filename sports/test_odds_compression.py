@@ -0,0 +1,59 @@
+import gzip
+
+import orjson
+from django.test import override_settings
+
+from backend.services.redis_service import redis_service
+from backend.services.store_odds_service import get_event_odds_raw, get_odds_key, is_gzipped, store_event_odds
+from sports.odds_test_utils import RedisTestCase, make_event, make_raw_market
+
+
+@override_settings(ODDS_COMPRESSION_ENABLED=True, ODDS_COMPRESSION_MIN_BYTES=4096)
+class OddsCompressionTests(RedisTestCase):
+    def setUp(self):
+        super().setUp()
+        store_event_odds(4, "9", make_event([make_raw_market(mid) for mid in range(20)], event_id="9"))
+        store_event_odds(4, "10", make_event([make_raw_market(1)], event_id="10"))
+        self.body = get_event_odds_raw("9")
+
+    def get(self, url, **headers):
+        return self.client.get(url, HTTP_X_TAGLINE_SECRET_KEY="test-key", **headers)
+
+    def stored(self, event_id):
+        return redis_service.binary_client.get(get_odds_key(4, event_id))
+
+    def test_only_large_documents_are_gzipped(self):
+        self.assertGreaterEqual(len(self.body), 4096)
+        self.assertTrue(is_gzipped(self.stored("9")))
+        self.assertEqual(gzip.decompress(self.stored("9")), self.body)
+        self.assertFalse(is_gzipped(self.stored("10")))
+
+    def test_gzip_is_passed_through(self):
+        response = self.get("/api/odds/9/", HTTP_ACCEPT_ENCODING="gzip, br")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertTrue(response["ETag"].startswith("W/"))
+        self.assertIn("Accept-Encoding", response["Vary"])
+        self.assertEqual(gzip.decompress(response.content), self.body)
+
+        etag = response["ETag"]
+        response = self.get("/api/odds/9/", HTTP_ACCEPT_ENCODING="gzip", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+    def test_plain_json_without_gzip(self):
+        response = self.get("/api/odds/9/")
+        self.assertFalse(response.has_header("Content-Encoding"))
+        self.assertFalse(response["ETag"].startswith("W/"))
+        self.assertIn("Accept-Encoding", response["Vary"])
+        self.assertEqual(response.content, self.body)
+
+        response = self.get("/api/odds/10/", HTTP_ACCEPT_ENCODING="gzip")
+        self.assertFalse(response.has_header("Content-Encoding"))
+        self.assertEqual(orjson.loads(response.content)["eventid"], "10")
+
+    def test_batch_reads_gzipped_documents(self):
+        response = self.client.post("/api/odds/batch/", data={"event_ids": ["9", "10"]},
+                                    content_type="application/json", HTTP_X_TAGLINE_SECRET_KEY="test-key")
+        data = orjson.loads(response.content)["data"]
+        self.assertEqual(len(data["9"]["markets"]["Match Odds"]), 20)
+        self.assertEqual(data["10"]["eventid"], "10")
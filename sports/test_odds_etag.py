@@ -0,0 +1,52 @@
+from backend.services.catalog_service import bump_catalog_version, get_catalog_etag
+from backend.services.store_odds_service import store_event_odds
+from sports.odds_test_utils import RedisTestCase, make_event, make_raw_market
+
+
+class OddsETagTests(RedisTestCase):
+    def setUp(self):
+        super().setUp()
+        self.raw_markets = [make_raw_market(1), make_raw_market(2, mname="Bookmaker")]
+        store_event_odds(4, 9, make_event(self.raw_markets))
+
+    def get(self, url, **headers):
+        return self.client.get(url, HTTP_X_TAGLINE_SECRET_KEY="test-key", **headers)
+
+    def test_unchanged_odds_answer_304(self):
+        response = self.get("/api/odds/9/")
+        self.assertEqual(response.status_code, 200)
+        etag = response["ETag"]
+
+        self.assertEqual(self.get("/api/odds/9/", HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        self.raw_markets[0]["status"] = "SUSPENDED"
+        store_event_odds(4, 9, make_event(self.raw_markets))
+        response = self.get("/api/odds/9/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+
+    def test_compact_representation_has_its_own_etag(self):
+        etag = self.get("/api/odds/9/")["ETag"]
+        response = self.get("/api/odds/9/?format=compact", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+        self.assertEqual(self.get("/api/odds/9/?format=compact", HTTP_IF_NONE_MATCH=response["ETag"]).status_code, 304)
+
+    def test_batch_etag_follows_its_events(self):
+        url = "/api/odds/batch/?event_ids=9,10"
+        etag = self.get(url)["ETag"]
+        self.assertEqual(self.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        self.assertNotEqual(self.get("/api/odds/batch/?event_ids=9")["ETag"], etag)
+
+        store_event_odds(4, 10, make_event(self.raw_markets, event_id="10"))
+        self.assertEqual(self.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_catalog_etag_changes_with_the_catalog(self):
+        etag = get_catalog_etag(None)
+        self.assertEqual(get_catalog_etag(None), etag)
+        bump_catalog_version()
+        self.assertNotEqual(get_catalog_etag(None), etag)
+
+    def test_catalog_endpoints_answer_304_without_the_database(self):
+        etag = f'"{get_catalog_etag(None)}"'
+        self.assertEqual(self.get("/api/sports-data/", HTTP_IF_NONE_MATCH=etag).status_code, 304)
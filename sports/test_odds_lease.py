@@ -0,0 +1,48 @@
+from unittest import mock
+
+from django.test import override_settings
+
+from backend.services.odds_lease_service import acquire_fetch_leases, get_fetch_lease_key, release_fetch_lease
+from backend.services.redis_service import redis_service
+from sports.odds_test_utils import RedisTestCase
+
+
+def _delete_if_equal(keys, args):
+    # the compare-and-delete script; fakeredis only runs Lua when lupa is installed
+    client = redis_service.redis_client
+    if client.get(keys[0]) == args[0]:
+        return client.delete(keys[0])
+    return 0
+
+
+@override_settings(ODDS_FETCH_LEASE_TTL=60)
+class FetchLeaseTests(RedisTestCase):
+    def setUp(self):
+        super().setUp()
+        patcher = mock.patch.object(redis_service, "_delete_if_equal", _delete_if_equal)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_queued_fetches_are_coalesced(self):
+        leases = acquire_fetch_leases([(4, "1"), (4, "2")])
+        self.assertEqual(set(leases), {(4, "1"), (4, "2")})
+        self.assertEqual(redis_service.redis_client.get(get_fetch_lease_key(4, "1")), leases[(4, "1")])
+        self.assertLessEqual(redis_service.redis_client.ttl(get_fetch_lease_key(4, "1")), 60)
+
+        self.assertEqual(acquire_fetch_leases([(4, "1"), (4, "3")]), {(4, "3"): mock.ANY})
+
+    def test_release_frees_the_event(self):
+        token = acquire_fetch_leases([(4, "1")])[(4, "1")]
+        self.assertTrue(release_fetch_lease(4, "1", token))
+        self.assertIn((4, "1"), acquire_fetch_leases([(4, "1")]))
+
+    def test_stale_token_keeps_the_next_lease(self):
+        stale = acquire_fetch_leases([(4, "1")])[(4, "1")]
+        # the lease expired and the event was dispatched again
+        redis_service.redis_client.delete(get_fetch_lease_key(4, "1"))
+        current = acquire_fetch_leases([(4, "1")])[(4, "1")]
+
+        self.assertFalse(release_fetch_lease(4, "1", stale))
+        self.assertFalse(release_fetch_lease(4, "1", None))
+        self.assertEqual(redis_service.redis_client.get(get_fetch_lease_key(4, "1")), current)
+        self.assertEqual(acquire_fetch_leases([(4, "1")]), {})
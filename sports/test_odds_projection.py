@@ -0,0 +1,77 @@
+from unittest import mock
+
+import orjson
+
+from backend.services import store_odds_service
+from backend.services.redis_service import redis_service
+from backend.services.store_odds_service import (
+    filter_markets,
+    get_event_odds,
+    get_odds_projection_key,
+    get_projected_odds_raw,
+    store_event_odds,
+)
+from sports.odds_test_utils import RedisTestCase, make_event, make_raw_market
+
+
+class OddsMarketFilterViewTests(RedisTestCase):
+    def test_market_ids_must_be_a_list_on_both_paths(self):
+        store_event_odds(4, 9, make_event([make_raw_market(mid) for mid in (1, 2, 12)]))
+
+        bodies = {}
+        for enabled in (True, False):
+            with self.settings(ODDS_PROJECTION_ENABLED=enabled):
+                response = self.client.post(
+                    "/api/odds/9/Match Odds/", data={"market_ids": "12"},
+                    content_type="application/json", HTTP_X_TAGLINE_SECRET_KEY="test-key",
+                )
+            self.assertEqual(response.status_code, 200)
+            bodies[enabled] = orjson.loads(response.content)
+
+        self.assertEqual(bodies[True], bodies[False])
+        self.assertEqual([m["marketId"] for m in bodies[True]["markets"]["Match Odds"]], ["1", "2", "12"])
+
+
+class ProjectedOddsTests(RedisTestCase):
+    def test_projection_matches_filter_markets(self):
+        raw_markets = [
+            make_raw_market(mid, mname=("Match Odds", "Bookmaker", f"Fancy {mid}")[mid % 3])
+            for mid in range(1, 10)
+        ]
+        store_event_odds(4, 9, make_event(raw_markets))
+
+        cases = [
+            (None, None),
+            ([], ["Bookmaker"]),
+            (["1", "5", 7], None),
+            (["1", "2"], ["bookmaker"]),
+            (None, ["fancy 3"]),
+            (["999"], None),
+            ("12", None),
+        ]
+        for market_ids, market_types in cases:
+            with self.subTest(market_ids=market_ids, market_types=market_types):
+                projected = get_projected_odds_raw(9, market_ids=market_ids, market_types=market_types)
+                expected = filter_markets(get_event_odds(9), market_ids=market_ids, market_types=market_types)
+                self.assertEqual(orjson.loads(projected), expected)
+
+    def test_no_projection_for_unknown_event(self):
+        self.assertIsNone(get_projected_odds_raw(77))
+
+    def test_stale_projection_is_rebuilt_and_never_served(self):
+        before = [make_raw_market(mid) for mid in (1, 2)]
+        after = [make_raw_market(mid, rate=2.5) for mid in (1, 2, 3)]
+        store_event_odds(4, 9, make_event(before))
+
+        # the projection write of the new odds is lost
+        with mock.patch.object(store_odds_service, "store_odds_projection", return_value=False):
+            self.assertTrue(store_event_odds(4, 9, make_event(after)))
+        self.assertIsNone(get_projected_odds_raw(9))
+
+        # the next identical fetch is unchanged, but rebuilds the projection
+        self.assertFalse(store_event_odds(4, 9, make_event(after)))
+        self.assertEqual(orjson.loads(get_projected_odds_raw(9)), get_event_odds(9))
+        self.assertEqual(
+            redis_service.redis_client.hget(get_odds_projection_key(9), "etag"),
+            store_odds_service.get_event_odds_index(9)["etag"],
+        )
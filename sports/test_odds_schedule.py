@@ -0,0 +1,49 @@
+from django.conf import settings
+from django.test import SimpleTestCase, override_settings
+
+from backend.services.odds_ingest_service import store_converted_odds
+from backend.services.odds_scheduler import compute_interval
+from backend.services.odds_watch_service import select_full_refresh_events
+from sports.odds_test_utils import RedisTestCase, make_event, make_raw_market
+
+
+class ScheduleTests(SimpleTestCase):
+    now = 1_000_000.0
+
+    def interval(self, inplay, status="OPEN", opens_in=None, unchanged=0):
+        open_time = None if opens_in is None else self.now + opens_in
+        return compute_interval(inplay, status, open_time, unchanged=unchanged, now=self.now)
+
+    def test_inplay_events_keep_the_inplay_interval(self):
+        for status in ("OPEN", "SUSPENDED", None):
+            self.assertEqual(self.interval(True, status, unchanged=10), settings.ODDS_SCHEDULE_INPLAY_INTERVAL)
+
+    def test_closed_events(self):
+        self.assertEqual(self.interval(True, "CLOSED"), settings.ODDS_SCHEDULE_CLOSED_INTERVAL)
+        self.assertEqual(self.interval(False, "closed"), settings.ODDS_SCHEDULE_CLOSED_INTERVAL)
+
+    @override_settings(ODDS_SCHEDULE_STARTING_INTERVAL=5, ODDS_SCHEDULE_PREMATCH_INTERVAL=15,
+                       ODDS_SCHEDULE_FUTURE_INTERVAL=60, ODDS_SCHEDULE_MAX_INTERVAL=120,
+                       ODDS_SCHEDULE_UNCHANGED_BACKOFF=2, ODDS_SCHEDULE_SUSPENDED_BACKOFF=3)
+    def test_prematch_intervals(self):
+        self.assertEqual(self.interval(False, opens_in=600), 5)
+        self.assertEqual(self.interval(False, opens_in=7200), 15)
+        self.assertEqual(self.interval(False), 15)
+        self.assertEqual(self.interval(False, opens_in=3 * 86400), 60)
+        self.assertEqual(self.interval(False, opens_in=600, unchanged=2), 20)
+        self.assertEqual(self.interval(False, "SUSPENDED", opens_in=600), 15)
+        self.assertEqual(self.interval(False, opens_in=7200, unchanged=10), 120)
+
+
+@override_settings(ODDS_SCHEDULE_ENABLED=False, ODDS_BULK_INGESTION_ENABLED=True)
+class BulkRefreshWithoutScheduleTests(RedisTestCase):
+    def test_refreshed_prematch_events_are_left_to_the_highlight_fetch(self):
+        events = [(4, "1"), (4, "2"), (4, "3")]
+        self.assertEqual(select_full_refresh_events(events), events)
+
+        prematch = make_event([make_raw_market(1)], event_id="1")
+        prematch.inplay = False
+        store_converted_odds(4, "1", prematch)
+        store_converted_odds(4, "2", make_event([make_raw_market(1)], event_id="2"))
+
+        self.assertEqual(select_full_refresh_events(events), [(4, "2"), (4, "3")])
@@ -0,0 +1,32 @@
+from unittest import mock
+
+from backend.services.redis_service import redis_service
+from backend.services.store_odds_service import get_event_odds, store_event_odds
+from sports.odds_test_utils import RedisTestCase, make_event, make_raw_market
+
+
+class StoreEventOddsTests(RedisTestCase):
+    def store_repeatedly(self):
+        raw_markets = [make_raw_market(mid) for mid in range(1, 4)]
+        results = [store_event_odds(4, 9, make_event(raw_markets)) for _ in range(3)]
+        raw_markets[1]["status"] = "SUSPENDED"
+        results.append(store_event_odds(4, 9, make_event(raw_markets)))
+        return results
+
+    def test_unchanged_odds_are_not_rewritten_with_projection(self):
+        with self.settings(ODDS_PROJECTION_ENABLED=True):
+            self.assertEqual(self.store_repeatedly(), [True, False, False, True])
+
+    def test_unchanged_odds_are_not_rewritten_without_projection(self):
+        with self.settings(ODDS_PROJECTION_ENABLED=False):
+            self.assertEqual(self.store_repeatedly(), [True, False, False, True])
+        self.assertEqual(get_event_odds(9)["markets"]["Match Odds"][1]["status"], "SUSPENDED")
+
+    def test_unchanged_odds_are_not_published(self):
+        raw_markets = [make_raw_market(mid) for mid in range(1, 4)]
+        with mock.patch.object(redis_service, "publish", return_value=0) as publish:
+            store_event_odds(4, 9, make_event(raw_markets))
+            published = publish.call_count
+            store_event_odds(4, 9, make_event(raw_markets))
+        self.assertGreater(published, 0)
+        self.assertEqual(publish.call_count, published)
@@ -0,0 +1,44 @@
+from django.test import SimpleTestCase
+
+from backend.services.store_odds_service import build_odds_delta, fingerprint_document
+from sports.odds_test_utils import make_document, make_raw_market
+
+
+class OddsDeltaTests(SimpleTestCase):
+    def setUp(self):
+        self.raw_markets = [make_raw_market(mid) for mid in range(1, 4)]
+        document = make_document(self.raw_markets)
+        self.previous = {**fingerprint_document(document), "event": "etag"}
+
+    def delta(self):
+        document = make_document(self.raw_markets)
+        return build_odds_delta(self.previous, document, fingerprint_document(document))
+
+    def test_nothing_changed(self):
+        self.assertIsNone(self.delta())
+
+    def test_only_changed_markets_are_sent(self):
+        self.raw_markets[1]["section"][0]["odds"][0]["odds"] = 9.5
+        delta = self.delta()
+        self.assertEqual(delta["type"], "delta")
+        self.assertEqual([m["marketId"] for m in delta["markets"]["Match Odds"]], ["2"])
+        self.assertEqual(delta["removed"], [])
+
+    def test_removed_markets_are_listed(self):
+        del self.raw_markets[2]
+        delta = self.delta()
+        self.assertEqual(delta["markets"], {})
+        self.assertEqual(delta["removed"], ["3"])
+
+    def test_header_change_alone_is_a_delta(self):
+        document = make_document(self.raw_markets)
+        document["inplay"] = False
+        delta = build_odds_delta(self.previous, document, fingerprint_document(document))
+        self.assertFalse(delta["inplay"])
+        self.assertEqual(delta["markets"], {})
+
+
+class OddsStreamViewTests(SimpleTestCase):
+    def test_refused_outside_the_asgi_application(self):
+        response = self.client.get("/api/odds/stream/?event_ids=9")
+        self.assertEqual(response.status_code, 400)
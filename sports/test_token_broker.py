@@ -0,0 +1,45 @@
+from unittest import mock
+
+from backend.services.redis_service import redis_service
+from backend.services.token_broker import TokenBroker
+from backend.services.token_manager import G_TOKEN_REQUESTS_KEY, request_token_refresh
+from sports.odds_test_utils import RedisTestCase
+
+
+class TokenBrokerTests(RedisTestCase):
+    def setUp(self):
+        super().setUp()
+        # no browser: refresh_token is mocked
+        self.broker = TokenBroker.__new__(TokenBroker)
+        self.broker.browser = mock.Mock()
+        self.broker.check_interval = float("inf")
+        self.broker._last_check = 0.0
+
+    def queued(self):
+        return redis_service.redis_client.lrange(G_TOKEN_REQUESTS_KEY, 0, -1)
+
+    def test_one_login_answers_every_queued_request(self):
+        request_token_refresh("old")
+        request_token_refresh("old")
+        with mock.patch("backend.services.token_broker.refresh_token") as refresh:
+            self.broker.run_once(wait=0.1)
+        refresh.assert_called_once_with(stale="old", fetch_token=self.broker.browser.fetch_token)
+        self.assertEqual(self.queued(), [])
+
+    def test_requests_stay_queued_when_the_login_fails(self):
+        request_token_refresh("old")
+        request_token_refresh(None)
+        with mock.patch("backend.services.token_broker.refresh_token", side_effect=Exception("login failed")):
+            with self.assertRaises(Exception):
+                self.broker.run_once(wait=0.1)
+        self.assertEqual(self.queued(), ["old", ""])
+
+    def test_requests_queued_during_the_login_are_kept(self):
+        request_token_refresh("old")
+
+        def login(stale, fetch_token):
+            request_token_refresh("new")
+
+        with mock.patch("backend.services.token_broker.refresh_token", side_effect=login):
+            self.broker.run_once(wait=0.1)
+        self.assertEqual(self.queued(), ["new"])
@@ -0,0 +1,112 @@
+from unittest import mock
+
+from django.test import override_settings
+
+from backend.services import scaper_service
+from backend.services.upstream_guard import (
+    CLOSED,
+    HALF_OPEN,
+    OPEN,
+    AdaptiveLimiter,
+    CircuitBreaker,
+    ConcurrencyLimitError,
+    get_endpoint_guard,
+)
+from sports.odds_test_utils import RedisTestCase
+
+
+class CircuitBreakerTests(RedisTestCase):
+    def test_opens_after_consecutive_failures(self):
+        breaker = CircuitBreaker("test", failure_threshold=3, reset_timeout=60)
+        breaker.record_failure()
+        breaker.record_failure()
+        breaker.record_success()
+        breaker.record_failure()
+        breaker.record_failure()
+        self.assertEqual(breaker.state, CLOSED)
+        breaker.record_failure()
+        self.assertEqual(breaker.state, OPEN)
+        self.assertFalse(breaker.allow())
+
+    def test_half_open_lets_a_single_probe_through(self):
+        breaker = CircuitBreaker("test", failure_threshold=1, reset_timeout=0)
+        breaker.record_failure()
+        self.assertTrue(breaker.allow())
+        self.assertEqual(breaker.state, HALF_OPEN)
+        self.assertFalse(breaker.allow())
+
+        breaker.record_failure()
+        self.assertEqual(breaker.state, OPEN)
+
+        self.assertTrue(breaker.allow())
+        breaker.record_success()
+        self.assertEqual(breaker.state, CLOSED)
+        self.assertTrue(breaker.allow())
+        self.assertTrue(breaker.allow())
+
+    @override_settings(UPSTREAM_AIMD_ENABLED=False, UPSTREAM_HEDGE_ENABLED=False)
+    def test_any_probe_error_reopens_the_circuit(self):
+        url = "https://upstream.test/api/gamedataPrivate"
+        breaker = CircuitBreaker("test", failure_threshold=1, reset_timeout=0)
+        breaker.record_failure()
+
+        with mock.patch.object(get_endpoint_guard(url), "breaker", breaker), \
+                mock.patch.object(scaper_service, "_send", side_effect=ValueError("bad response")):
+            with self.assertRaises(ValueError):
+                scaper_service.make_request("cookie", url=url)
+
+        self.assertEqual(breaker.state, OPEN)
+        self.assertTrue(breaker.allow())
+
+
+class AdaptiveLimiterTests(RedisTestCase):
+    def limiter(self, cooldown=0.0):
+        return AdaptiveLimiter("test", initial=2, min_limit=1, max_limit=4,
+                               backoff=0.5, latency_factor=3, cooldown=cooldown)
+
+    def test_limit_caps_in_flight_calls(self):
+        limiter = self.limiter()
+        limiter.acquire(timeout=0)
+        limiter.acquire(timeout=0)
+        with self.assertRaises(ConcurrencyLimitError):
+            limiter.acquire(timeout=0)
+        limiter.cancel()
+        limiter.acquire(timeout=0)
+        self.assertEqual(limiter.limit, 2)
+
+    def test_additive_increase_up_to_max(self):
+        limiter = self.limiter()
+        limiter.acquire(timeout=0)
+        limiter.release(ok=True)
+        self.assertEqual(limiter.limit, 2.5)
+        for _ in range(20):
+            limiter.acquire(timeout=0)
+            limiter.release(ok=True)
+        self.assertEqual(limiter.limit, 4)
+
+    def test_multiplicative_decrease_down_to_min(self):
+        limiter = self.limiter()
+        limiter.acquire(timeout=0)
+        limiter.release(ok=False)
+        self.assertEqual(limiter.limit, 1)
+        limiter.acquire(timeout=0)
+        limiter.release(ok=False)
+        self.assertEqual(limiter.limit, 1)
+
+    def test_latency_spike_backs_off(self):
+        limiter = self.limiter()
+        limiter.acquire(timeout=0)
+        limiter.release(ok=True, latency=0.2, baseline=0.1)
+        self.assertEqual(limiter.limit, 2.5)
+        limiter.acquire(timeout=0)
+        limiter.release(ok=True, latency=1.0, baseline=0.1)
+        self.assertEqual(limiter.limit, 1.25)
+
+    def test_one_backoff_per_cooldown(self):
+        limiter = self.limiter(cooldown=60)
+        limiter.acquire(timeout=0)
+        limiter.acquire(timeout=0)
+        limiter.release(ok=False)
+        limiter.release(ok=False)
+        self.assertEqual(limiter.limit, 1)
+        self.assertEqual(limiter.in_flight, 0)
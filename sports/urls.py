@@ -8,8 +8,11 @@ urlpatterns = [
     path("sports-data/", views.SportListView.as_view(), name="sport-list"),
     path("<int:event_type_id>/competitions/", views.CompetitionListAPIView.as_view(), name="competition-list"),
     path("<int:event_type_id>/<int:competition_id>/events/", views.EventListAPIView.as_view(), name="event-list-by-sport-competition"),
+    path('odds/batch/', views.GetOddsBatchView.as_view(), name='odds-batch'),
+    path('odds/stream/', views.odds_stream_view, name='odds-stream'),
     path('odds/<str:event_id>/', 
          views.GetOddsByEventAndMarketView.as_view(), 
          name='odds-by-event'),
     path('odds/<str:event_id>/<str:market_type>/', views.GetOddsByEventAndMarketView.as_view(), name='get-odds-by-market-type'),
+    path("metrics/", views.MetricsView.as_view(), name="metrics"),
 ]
\ No newline at end of file
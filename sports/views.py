@@ -15,6 +15,9 @@ from rest_framework.response import Response
 from backend.permissions import HasTaglineSecretKey
 from typing import List, Dict, Any, Optional
 from backend.services.redis_service import redis_service
+from backend.services.catalog_service import get_catalog_etag
+from django.utils.decorators import method_decorator
+from django.views.decorators.http import etag
 load_dotenv()
 
 
@@ -88,6 +91,7 @@ class HighlightHomePrivateView(APIView):
             return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
+@method_decorator(etag(get_catalog_etag), name="get")
 class SportListView(ListAPIView):
     queryset = Sport.objects.all()
     serializer_class = SportSerializer
@@ -103,6 +107,7 @@ class SportListView(ListAPIView):
         }, status=status.HTTP_200_OK)
 
 
+@method_decorator(etag(get_catalog_etag), name="get")
 class CompetitionListAPIView(APIView):
     permission_classes = [HasTaglineSecretKey]
 
@@ -129,6 +134,7 @@ class CompetitionListAPIView(APIView):
             }, status=status.HTTP_404_NOT_FOUND)
 
 
+@method_decorator(etag(get_catalog_etag), name="get")
 class EventListAPIView(APIView):
     permission_classes = [HasTaglineSecretKey]
     def get(self, request, event_type_id=None, competition_id=None):
@@ -176,17 +182,113 @@ from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
 import logging
+import asyncio
+import hashlib
+import re
+import time
+import orjson
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import quote_etag
 from typing import Dict, Any, List, Optional
 from backend.services.redis_service import redis_service
+from backend.services.store_odds_service import (
+    get_event_odds,
+    get_event_odds_index,
+    get_multiple_event_odds,
+    get_multiple_event_odds_index,
+    get_multiple_event_odds_raw,
+    get_odds_stored,
+    get_projected_odds_raw,
+    decode_stored_odds,
+    filter_markets,
+    is_gzipped,
+)
+from backend.renderers import ODDS_RENDERER_CLASSES
+from backend.services.compact_odds import COMPACT_SCHEMA, compact_event, parse_levels
+from backend.services.metrics import get_metrics
+from backend.services.odds_stream_service import odds_stream_hub
+from backend.services.odds_watch_service import mark_events_watched
 
 logger = logging.getLogger(__name__)
 
-class GetOddsByEventAndMarketView(APIView):
+_ACCEPTS_GZIP = re.compile(r"\bgzip\b")
+
+class OddsResponseMixin:
+    """
+    Shared rendering and conditional-request handling for the odds endpoints.
+
+    Odds documents are stored response-shaped by the ingestion task, so
+    unfiltered reads pass the stored JSON straight through and filtered
+    reads are rendered with orjson.
+
+    `?format=compact` (or `Accept: application/msgpack`) selects the compact
+    array-based encoding (see compact_odds), as JSON or MessagePack, with
+    ladders capped to `?levels=N`.
+
+    Documents stored gzipped are sent as stored, with `Content-Encoding:
+    gzip`, to clients that accept it, and inflated for the others.
+    """
+    renderer_classes = ODDS_RENDERER_CLASSES
+
+    def _is_compact(self) -> bool:
+        renderer = getattr(self.request, "accepted_renderer", None)
+        return renderer is not None and renderer.format == "compact"
+
+    def _compact(self, odds_data: Dict, with_schema: bool = True) -> Dict:
+        levels = parse_levels(self.request.query_params.get("levels"))
+        return compact_event(odds_data, levels=levels, with_schema=with_schema)
+
+    def _representation_etag(self, etag_value: Optional[str]) -> Optional[str]:
+        # the compact encodings are other representations of the same odds: own ETags
+        if not etag_value or not self._is_compact():
+            return etag_value
+        encoding = self.request.accepted_renderer.media_type.rsplit("/", 1)[-1]
+        levels = parse_levels(self.request.query_params.get("levels")) or "all"
+        return f"{etag_value}-{encoding}-{levels}"
+
+    def _raw_json_response(self, raw) -> HttpResponse:
+        return HttpResponse(raw, content_type="application/json", status=status.HTTP_200_OK)
+
+    def _accepts_gzip(self) -> bool:
+        return bool(_ACCEPTS_GZIP.search(self.request.META.get("HTTP_ACCEPT_ENCODING", "")))
+
+    def _stored_json_response(self, stored: bytes) -> HttpResponse:
+        if is_gzipped(stored) and self._accepts_gzip():
+            response = self._raw_json_response(stored)
+            response["Content-Encoding"] = "gzip"
+        else:
+            response = self._raw_json_response(decode_stored_odds(stored))
+        patch_vary_headers(response, ["Accept-Encoding"])
+        return response
+
+    def _not_modified(self, request, etag_value: Optional[str]) -> Optional[HttpResponse]:
+        # answers If-None-Match with 304 before any odds document is loaded
+        if not etag_value:
+            return None
+        return get_conditional_response(request, etag=quote_etag(etag_value))
+
+    def _with_etag(self, response, etag_value: Optional[str]):
+        if etag_value:
+            response["ETag"] = quote_etag(etag_value)
+            if response.get("Content-Encoding") == "gzip":
+                # same odds, other bytes: weak, like GZipMiddleware does
+                response["ETag"] = "W/" + response["ETag"]
+        patch_vary_headers(response, ["Accept"])
+        return response
+
+
+class GetOddsByEventAndMarketView(OddsResponseMixin, APIView):
     """
     API to get odds data by event_id
     
     GET  /api/odds/{event_id}/                -> All markets for the event
     POST /api/odds/{event_id}/Bookmaker/      -> Filtered by market_ids (if provided in body)
+
+    Both accept ?format=compact&levels=N (see OddsResponseMixin).
     """
     permission_classes = [HasTaglineSecretKey]
 
@@ -196,15 +298,32 @@ class GetOddsByEventAndMarketView(APIView):
         if validation_error:
             return validation_error
 
-        odds_data = self._get_event_odds_data(event_id)
-        if not odds_data:
+        mark_events_watched([event_id])
+
+        # fast path: the index entry carries the ETag, and the stored document is already the response body
+        try:
+            index = get_event_odds_index(event_id)
+            etag_value = self._representation_etag(index.get("etag") if index else None)
+
+            not_modified = self._not_modified(request, etag_value)
+            if not_modified:
+                return not_modified
+
+            stored_odds = get_odds_stored(index)
+        except Exception as e:
+            logger.error(f"Error getting event odds: {e}")
+            etag_value, stored_odds = None, None
+
+        if not stored_odds:
             return Response({
                 'success': False,
                 'error': f'No odds data found for event {event_id}',
                 'data': {}
             }, status=status.HTTP_404_NOT_FOUND)
 
-        return Response(odds_data, status=status.HTTP_200_OK)
+        if self._is_compact():
+            return self._with_etag(Response(self._compact(orjson.loads(decode_stored_odds(stored_odds)))), etag_value)
+        return self._with_etag(self._stored_json_response(stored_odds), etag_value)
 
     # ----------------- POST -----------------
     def post(self, request, event_id=None, market_type=None):
@@ -217,6 +336,30 @@ class GetOddsByEventAndMarketView(APIView):
         if validation_error:
             return validation_error
 
+        mark_events_watched([event_id])
+
+        # ✅ handle both dict & list request bodies
+        if isinstance(request.data, list):
+            market_ids = request.data
+        else:
+            market_ids = request.data.get("market_ids", [])
+        if not isinstance(market_ids, list):
+            # only a list filters, whichever path below serves the request
+            market_ids = []
+        market_types = [market_type] if market_type else None
+
+        if settings.ODDS_PROJECTION_ENABLED:
+            # only the requested markets leave Redis, already serialized
+            try:
+                raw_odds = get_projected_odds_raw(event_id, market_ids=market_ids, market_types=market_types)
+            except Exception as e:
+                logger.error(f"Error getting projected event odds: {e}")
+                raw_odds = None
+            if raw_odds and self._is_compact():
+                return self._with_etag(Response(self._compact(orjson.loads(raw_odds))), None)
+            if raw_odds:
+                return self._with_etag(self._raw_json_response(raw_odds), None)
+
         odds_data = self._get_event_odds_data(event_id)
         if not odds_data:
             return Response({
@@ -225,32 +368,15 @@ class GetOddsByEventAndMarketView(APIView):
                 'data': {}
             }, status=status.HTTP_404_NOT_FOUND)
 
-        # ✅ handle both dict & list request bodies
-        if isinstance(request.data, list):
-            market_ids = request.data
-        else:
-            market_ids = request.data.get("market_ids", [])
-
-        # filter by market_ids
-        if isinstance(market_ids, list) and market_ids:
-            filtered_markets = {}
-            for key, markets_list in odds_data.get("markets", {}).items():
-                filtered = [m for m in markets_list if m.get("marketId") in market_ids]
-                if filtered:
-                    filtered_markets[key] = filtered
-            odds_data["markets"] = filtered_markets
-
-        # filter by market_type from URL
-        if market_type:
-            filtered_by_type = {
-                key: markets_list
-                for key, markets_list in odds_data.get("markets", {}).items()
-                if key.lower() == market_type.lower()
-                or any(m.get("market") and m["market"].lower() == market_type.lower() for m in markets_list)
-            }
-            odds_data["markets"] = filtered_by_type
+        odds_data = filter_markets(
+            odds_data,
+            market_ids=market_ids,
+            market_types=market_types,
+        )
 
-        return Response(odds_data, status=status.HTTP_200_OK)
+        if self._is_compact():
+            odds_data = self._compact(odds_data)
+        return self._with_etag(Response(odds_data, status=status.HTTP_200_OK), None)
 
 
     # ----------------- Helpers -----------------
@@ -265,37 +391,253 @@ class GetOddsByEventAndMarketView(APIView):
 
     def _get_event_odds_data(self, event_id: str) -> Dict:
         try:
-            pattern = "odds:*:*"
-            for redis_key in redis_service.get_keys_by_pattern(pattern):
-                event_data = redis_service.get_data(redis_key)
-                if not event_data or not isinstance(event_data, dict):
-                    continue
+            event_data = get_event_odds(event_id)
+            if not event_data or not isinstance(event_data, dict):
+                return {}
+            return event_data
+        except Exception as e:
+            logger.error(f"Error getting event odds: {e}")
+            return {}
 
-                if str(event_data.get('eventid', '')) == str(event_id) or str(event_data.get('eventId', '')) == str(event_id):
-                    return self._format_event_response(event_data)
 
-            # fallback: direct event_id search
-            alternative_pattern = f"odds:*:{event_id}"
-            for redis_key in redis_service.get_keys_by_pattern(alternative_pattern):
-                event_data = redis_service.get_data(redis_key)
-                if event_data and isinstance(event_data, dict):
-                    return self._format_event_response(event_data)
+class GetOddsBatchView(OddsResponseMixin, APIView):
+    """
+    API to get odds for many events in one round trip
 
-            return {}
+    GET  /api/odds/batch/?event_ids=1,2&market_types=Bookmaker
+    POST /api/odds/batch/  { "event_ids": [...], "market_ids": [...], "market_types": [...] }
+
+    Returns a map keyed by event_id; events without live odds map to null.
+    With ?format=compact the map holds compact events under one shared schema.
+    """
+    permission_classes = [HasTaglineSecretKey]
+    max_events = 100
+
+    # ----------------- GET -----------------
+    def get(self, request):
+        return self._batch_response(
+            self._split_param(request.query_params.get("event_ids")),
+            market_ids=self._split_param(request.query_params.get("market_ids")),
+            market_types=self._split_param(request.query_params.get("market_types")),
+            request=request,
+        )
+
+    # ----------------- POST -----------------
+    def post(self, request):
+        """
+        POST with event_ids as either:
+        - { "event_ids": ["id1","id2"], "market_ids": [...], "market_types": [...] }
+        - ["id1","id2"]
+        """
+        if isinstance(request.data, list):
+            return self._batch_response(request.data)
+
+        return self._batch_response(
+            request.data.get("event_ids", []),
+            market_ids=request.data.get("market_ids", []),
+            market_types=request.data.get("market_types", []),
+        )
+
+    # ----------------- Helpers -----------------
+    def _split_param(self, value: Optional[str]) -> List[str]:
+        if not value:
+            return []
+        return [item.strip() for item in value.split(",") if item.strip()]
+
+    def _batch_etag(self, request, indexes: Dict[str, Optional[Dict]]) -> str:
+        # combines the per-event ETags with the query, so it changes when any event (or filter) does
+        parts = [request.GET.urlencode()] + [
+            f"{event_id}={(index or {}).get('etag', '')}" for event_id, index in indexes.items()
+        ]
+        return hashlib.blake2b("|".join(parts).encode("utf-8"), digest_size=8).hexdigest()
+
+    def _batch_response(self, event_ids, market_ids=None, market_types=None, request=None) -> Response:
+        if not isinstance(event_ids, list) or not event_ids:
+            return Response({
+                'success': False,
+                'error': 'event_ids is required',
+                'data': {}
+            }, status=status.HTTP_400_BAD_REQUEST)
+        for name, value in (("market_ids", market_ids), ("market_types", market_types)):
+            if value is not None and not isinstance(value, list):
+                return Response({
+                    'success': False,
+                    'error': f'{name} must be a list',
+                    'data': {}
+                }, status=status.HTTP_400_BAD_REQUEST)
+
+        # preserve request order, drop duplicates
+        event_ids = list(dict.fromkeys(str(event_id).strip() for event_id in event_ids if str(event_id).strip()))
+        if len(event_ids) > self.max_events:
+            return Response({
+                'success': False,
+                'error': f'At most {self.max_events} event_ids are allowed per request',
+                'data': {}
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        mark_events_watched(event_ids)
+
+        try:
+            indexes = get_multiple_event_odds_index(event_ids)
         except Exception as e:
-            logger.error(f"Error getting event odds: {e}")
-            return {}
+            logger.error(f"Error getting batch event odds: {e}")
+            indexes = {}
 
-    def _format_event_response(self, event_data: Dict) -> Dict:
-        return {
-            "eventid": str(event_data.get('eventid', event_data.get('eventId', ''))),
-            "eventName": event_data.get('eventName', ''),
-            "updateTime": event_data.get('updateTime'),
-            "status": event_data.get('status', 'OPEN'),
-            "inplay": event_data.get('inplay', False),
-            "sport": event_data.get('sport', {}),
-            "sportId": event_data.get('sportId'),
-            "eventId": str(event_data.get('eventid', event_data.get('eventId', ''))),
-            "isLiveStream": event_data.get('isLiveStream'),
-            "markets": event_data.get('markets', {})
-        }
+        # conditional GET: compare against the index entries only
+        etag_value = self._batch_etag(request, indexes) if request is not None and indexes else None
+        etag_value = self._representation_etag(etag_value)
+        not_modified = self._not_modified(request, etag_value)
+        if not_modified:
+            return not_modified
+
+        compact = self._is_compact()
+        if not market_ids and not market_types and not compact:
+            return self._with_etag(self._raw_batch_response(event_ids, indexes), etag_value)
+
+        try:
+            odds_by_event = get_multiple_event_odds(event_ids, indexes=indexes)
+        except Exception as e:
+            logger.error(f"Error getting batch event odds: {e}")
+            odds_by_event = {}
+
+        data = {}
+        for event_id in event_ids:
+            event_data = odds_by_event.get(event_id)
+            if not event_data or not isinstance(event_data, dict):
+                data[event_id] = None
+                continue
+            data[event_id] = filter_markets(
+                event_data,
+                market_ids=market_ids,
+                market_types=market_types,
+            )
+            if compact:
+                data[event_id] = self._compact(data[event_id], with_schema=False)
+
+        body = {'success': True, 'data': data}
+        if compact:
+            # one schema for the whole batch
+            body = {'success': True, 'schema': COMPACT_SCHEMA, 'data': data}
+        return self._with_etag(Response(body, status=status.HTTP_200_OK), etag_value)
+
+    def _raw_batch_response(self, event_ids: List[str], indexes: Dict[str, Optional[Dict]]) -> HttpResponse:
+        # splice the documents' JSON into the envelope without parsing them
+        try:
+            raw_by_event = get_multiple_event_odds_raw(event_ids, indexes=indexes)
+        except Exception as e:
+            logger.error(f"Error getting batch event odds: {e}")
+            raw_by_event = {}
+
+        entries = []
+        for event_id in event_ids:
+            raw_odds = raw_by_event.get(event_id)
+            entries.append(orjson.dumps(event_id) + b":" + (raw_odds or b"null"))
+
+        return self._raw_json_response(b'{"success":true,"data":{' + b",".join(entries) + b"}}")
+
+
+class MetricsView(APIView):
+    """
+    API exposing the counters and gauges pushed by every web/worker process
+    (odds cache hit rates, ingestion timings, upstream health, ...).
+    """
+    permission_classes = [HasTaglineSecretKey]
+
+    def get(self, request):
+        return Response({
+            "status": True,
+            "message": "Metrics fetched successfully",
+            "data": get_metrics(),
+        }, status=status.HTTP_200_OK)
+
+
+async def odds_stream_view(request):
+    """
+    Server-Sent Events stream of odds for a set of events.
+
+    GET /api/odds/stream/?event_ids=1,2&market_types=Bookmaker
+
+    Sends one `snapshot` event per event_id, then `delta` events holding only
+    the markets that changed (plus `removed` market ids). Must be served by
+    the ASGI application (backend.asgi) so an open stream does not hold a
+    worker thread; under WSGI the endless stream would be buffered in a
+    worker, so it is refused there.
+    """
+    if not isinstance(request, ASGIRequest):
+        return JsonResponse({
+            'success': False,
+            'error': 'The odds stream is only served by the ASGI application',
+            'data': {}
+        }, status=400)
+    if request.method != "GET":
+        return JsonResponse({'success': False, 'error': 'Method not allowed', 'data': {}}, status=405)
+    if not HasTaglineSecretKey().has_permission(request, None):
+        return JsonResponse({'success': False, 'error': 'Permission denied', 'data': {}}, status=403)
+
+    event_ids = [item.strip() for item in request.GET.get("event_ids", "").split(",") if item.strip()]
+    market_types = [item.strip() for item in request.GET.get("market_types", "").split(",") if item.strip()]
+    event_ids = list(dict.fromkeys(event_ids))
+    if not event_ids or len(event_ids) > GetOddsBatchView.max_events:
+        return JsonResponse({
+            'success': False,
+            'error': f'Between 1 and {GetOddsBatchView.max_events} event_ids are required',
+            'data': {}
+        }, status=400)
+
+    # Redis only, no ORM: off the shared sync thread, so streams do not queue behind sync views
+    read_odds = sync_to_async(get_multiple_event_odds, thread_sensitive=False)
+    mark_watched = sync_to_async(mark_events_watched, thread_sensitive=False)
+
+    def sse(event: str, data) -> bytes:
+        return b"event: " + event.encode("utf-8") + b"\ndata: " + orjson.dumps(data) + b"\n\n"
+
+    async def snapshots():
+        odds_by_event = await read_odds(event_ids)
+        for event_id in event_ids:
+            odds_data = odds_by_event.get(event_id)
+            if odds_data:
+                odds_data = filter_markets(odds_data, market_types=market_types)
+            yield sse("snapshot", {"eventid": event_id, "data": odds_data})
+
+    async def stream():
+        subscriber = odds_stream_hub.subscribe(event_ids)
+        try:
+            await mark_watched(event_ids)
+            watched_at = time.monotonic()
+            async for chunk in snapshots():
+                yield chunk
+
+            while True:
+                if time.monotonic() - watched_at >= settings.ODDS_WATCH_TTL / 2:
+                    # an open stream keeps its events watched (full markets)
+                    await mark_watched(event_ids)
+                    watched_at = time.monotonic()
+                try:
+                    event_id, delta = await asyncio.wait_for(
+                        subscriber.queue.get(), timeout=settings.ODDS_STREAM_KEEPALIVE
+                    )
+                except asyncio.TimeoutError:
+                    yield b": keepalive\n\n"
+                    continue
+
+                if subscriber.resync:
+                    # fell behind (or missed messages): start over from fresh snapshots
+                    while not subscriber.queue.empty():
+                        subscriber.queue.get_nowait()
+                    subscriber.resync = False
+                    async for chunk in snapshots():
+                        yield chunk
+                    continue
+
+                if delta is None:
+                    continue
+                if market_types:
+                    delta = filter_markets(dict(delta), market_types=market_types)
+                yield sse("delta", delta)
+        finally:
+            odds_stream_hub.unsubscribe(subscriber)
+
+    response = StreamingHttpResponse(stream(), content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"
+    return response